@@ -0,0 +1,318 @@
+import os
+import sys
+import io
+import json
+import time
+import random
+import shutil
+import statistics
+import subprocess
+import argparse
+import platform
+import tempfile
+import contextlib
+from pathlib import Path
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+UZANTILAR = [('.txt', 20), ('.pdf', 10), ('.jpg', 15), ('.docx', 8), ('.json', 6), ('.tmp', 5), ('.log', 5),
+             ('.bak', 2), ('.zip', 3), ('.exe', 1), ('.pyc', 4), ('.mp4', 2), ('.csv', 6)]
+KELIMELER = ['rapor', 'fatura', 'kopya', 'taslak', 'yedek', 'sunum', 'proje', 'temp', 'final', 'not']
+SISTEM_ISIMLERI = ['Thumbs.db', 'desktop.ini']
+VARSAYILAN_MODULLER = '1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16'
+PARAMETRE_DOSYASI = 'agac_parametreleri.json'
+KALE_ARTIKLARI = ('.kale_*.sqlite*', 'snapshot_*.db', 'snapshot_*.json', 'kale_gunluk_*.log*')
+
+def tepe_rss_kb():
+    if resource is None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+def icerik_uret(icerik_id: int, boyut: int) -> bytes:
+    return random.Random(icerik_id).randbytes(boyut)
+
+def agac_uret(kok: Path, dosya_sayisi: int, derinlik: int, genislik: int, medyan_boyut: int, azami_boyut: int,
+              kopya_orani: float, hex_orani: float, kilit_orani: float, bos_orani: float, eski_orani: float,
+              tohum: int):
+    rng = random.Random(tohum)
+    dizinler = [kok]
+    seviye = [kok]
+    for d in range(derinlik):
+        yeni = []
+        for ust in seviye:
+            for i in range(genislik):
+                yeni.append(ust / f"{rng.choice(KELIMELER)}_{d}_{i}")
+        dizinler.extend(yeni)
+        seviye = yeni
+    for d in dizinler:
+        d.mkdir(parents=True, exist_ok=True)
+
+    uzantilar, agirliklar = zip(*UZANTILAR)
+    icerikler = []
+    simdi = time.time()
+    toplam_bayt = 0
+    for n in range(dosya_sayisi):
+        zar = rng.random()
+        uzanti = rng.choices(uzantilar, agirliklar)[0]
+        if zar < hex_orani:
+            isim = f"{rng.getrandbits(128):032x}{uzanti}"
+        elif zar < hex_orani + kilit_orani:
+            isim = f"~${rng.choice(KELIMELER)}_{n}.docx"
+        elif zar < hex_orani + kilit_orani + 0.005:
+            isim = rng.choice(SISTEM_ISIMLERI)
+        else:
+            isim = f"{rng.choice(KELIMELER)}_{n}{uzanti}"
+
+        if icerikler and rng.random() < kopya_orani:
+            icerik_id, boyut = rng.choice(icerikler)
+        elif rng.random() < bos_orani:
+            icerik_id, boyut = 0, 0
+        else:
+            icerik_id = n + 1
+            boyut = min(int(rng.lognormvariate(0, 1.5) * medyan_boyut), azami_boyut)
+            if boyut: icerikler.append((icerik_id, boyut))
+
+        yol = rng.choice(dizinler) / isim
+        with open(yol, 'wb') as f:
+            f.write(icerik_uret(icerik_id, boyut))
+        if rng.random() < eski_orani:
+            eski = simdi - rng.uniform(200, 1000) * 86400
+            os.utime(yol, (eski, eski))
+        toplam_bayt += boyut
+    return len(dizinler), toplam_bayt
+
+def artiklari_temizle(*dizinler: Path):
+    for dizin in dizinler:
+        for desen in KALE_ARTIKLARI:
+            for yol in dizin.glob(desen):
+                yol.unlink()
+
+def agaci_hazirla(calisma_dizini: Path, parametreler: dict, yeniden=False):
+    kok = calisma_dizini / 'agac'
+    parametre_yolu = calisma_dizini / PARAMETRE_DOSYASI
+    if not yeniden and kok.exists() and parametre_yolu.exists() and not any(kok.glob('.karantina_*')):
+        with open(parametre_yolu, encoding='utf-8') as f:
+            kayitli = json.load(f)
+        if kayitli.get('parametreler') == parametreler:
+            artiklari_temizle(kok, calisma_dizini)
+            return kok, kayitli, True
+    if kok.exists():
+        shutil.rmtree(kok)
+    baslangic = time.perf_counter()
+    dizin_sayisi, toplam_bayt = agac_uret(kok, **parametreler)
+    bilgi = {'parametreler': parametreler, 'dizin': dizin_sayisi, 'bayt': toplam_bayt,
+             'uretim_sn': round(time.perf_counter() - baslangic, 3)}
+    with open(parametre_yolu, 'w', encoding='utf-8') as f:
+        json.dump(bilgi, f, indent=2)
+    return kok, bilgi, False
+
+class Olcer:
+    def __init__(self):
+        self.fazlar = {}
+
+    @contextlib.contextmanager
+    def faz(self, ad: str):
+        sonuc = {'dosya': 0, 'bayt': 0}
+        onceki_rss = tepe_rss_kb()
+        baslangic = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield sonuc
+        sure = time.perf_counter() - baslangic
+        sonuc['sure_sn'] = round(sure, 4)
+        sonuc['dosya_sn'] = round(sonuc['dosya'] / sure, 1) if sure else None
+        sonuc['bayt_sn'] = round(sonuc['bayt'] / sure, 1) if sure else None
+        sonuc['surec_tepe_rss_kb'] = tepe_rss_kb()
+        sonuc['tepe_rss_artis_kb'] = sonuc['surec_tepe_rss_kb'] - onceki_rss if onceki_rss is not None else None
+        self.fazlar[ad] = sonuc
+        print(f"  {ad:<28} {sure:9.3f} sn  {sonuc['dosya']:>9} dosya  "
+              f"{sonuc['bayt'] / 1024 / 1024:10.1f} MB", file=sys.stderr)
+
+def karsilastir(onceki_yol: str, fazlar: dict):
+    with open(onceki_yol, encoding='utf-8') as f:
+        onceki = json.load(f).get('fazlar', {})
+    print("\nKarşılaştırma (yeni / önceki süre):", file=sys.stderr)
+    for ad, sonuc in fazlar.items():
+        eski = onceki.get(ad)
+        if not eski or not eski.get('sure_sn'): continue
+        oran = sonuc['sure_sn'] / eski['sure_sn']
+        isaret = '🔺' if oran > 1.1 else ('🔻' if oran < 0.9 else '  ')
+        print(f"  {isaret} {ad:<28} {oran:6.2f}x  ({eski['sure_sn']} -> {sonuc['sure_sn']} sn)", file=sys.stderr)
+
+def baslangic_olc(args):
+    betik = Path(__file__).resolve().parent / 'toplutemizlik.py'
+    komutlar = {
+        'yorumlayici': [sys.executable, '-c', 'pass'],
+        'ice_aktarma': [sys.executable, '-c', 'import toplutemizlik'],
+        'yardim': [sys.executable, str(betik), '--help'],
+        'yardim_modul': [sys.executable, '-m', 'toplutemizlik', '--help'],
+    }
+    calisma_dizini = tempfile.mkdtemp(prefix='kale_baslangic_')
+    ortam = dict(os.environ, PYTHONPATH=str(betik.parent))
+    ortam.pop('PYTHONDONTWRITEBYTECODE', None)
+    fazlar = {}
+    try:
+        for ad, komut in komutlar.items():
+            subprocess.run(komut, cwd=calisma_dizini, env=ortam, stdout=subprocess.DEVNULL, check=True)
+            sureler = []
+            for _ in range(args.startup_runs):
+                baslangic = time.perf_counter()
+                subprocess.run(komut, cwd=calisma_dizini, env=ortam, stdout=subprocess.DEVNULL, check=True)
+                sureler.append(time.perf_counter() - baslangic)
+            fazlar[ad] = {'sure_sn': round(statistics.median(sureler), 4), 'en_az_sn': round(min(sureler), 4),
+                          'tekrar': args.startup_runs}
+            print(f"{ad:<14} medyan {fazlar[ad]['sure_sn'] * 1000:8.1f} ms  "
+                  f"en az {fazlar[ad]['en_az_sn'] * 1000:8.1f} ms", file=sys.stderr)
+        yan_etkiler = os.listdir(calisma_dizini)
+        if yan_etkiler:
+            print(f"⚠️  İçe aktarma/yardım çalışma dizininde dosya bıraktı: {', '.join(sorted(yan_etkiler))}",
+                  file=sys.stderr)
+    finally:
+        shutil.rmtree(calisma_dizini, ignore_errors=True)
+    sonuc = {
+        'zaman': datetime.now().isoformat(timespec='seconds'),
+        'ortam': {'python': platform.python_version(), 'platform': platform.platform(),
+                  'islemci': os.cpu_count()},
+        'fazlar': fazlar,
+    }
+    if args.compare:
+        karsilastir(args.compare, fazlar)
+    return sonuc
+
+def calistir(args):
+    calisma_dizini = Path(args.workdir or tempfile.mkdtemp(prefix='kale_bench_')).resolve()
+    calisma_dizini.mkdir(parents=True, exist_ok=True)
+    parametreler = {
+        'dosya_sayisi': args.files, 'derinlik': args.depth, 'genislik': args.width,
+        'medyan_boyut': args.median_size, 'azami_boyut': args.max_size, 'kopya_orani': args.dup_ratio,
+        'hex_orani': args.hex_ratio, 'kilit_orani': args.lock_ratio, 'bos_orani': args.empty_ratio,
+        'eski_orani': args.old_ratio, 'tohum': args.seed,
+    }
+    print(f"Çalışma dizini: {calisma_dizini}", file=sys.stderr)
+    kok, agac_bilgisi, yeniden_kullanildi = agaci_hazirla(calisma_dizini, parametreler, args.regenerate)
+    print(f"Ağaç {'yeniden kullanıldı' if yeniden_kullanildi else 'üretildi'}: {args.files} dosya, "
+          f"{agac_bilgisi['dizin']} dizin, {agac_bilgisi['bayt'] / 1024 / 1024:.1f} MB", file=sys.stderr)
+
+    os.chdir(calisma_dizini)
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import toplutemizlik as kale
+    denetim = kale.denetim_baslat(kale.varsayilan_oturum_id(), calisma_dizini)
+
+    olcer = Olcer()
+    with olcer.faz('tarama') as s:
+        kayitlar = list(kale.kale_tarayici(kok))
+        s['dosya'] = len(kayitlar)
+    if args.scan_workers > 1:
+        with olcer.faz(f'tarama_paralel_{args.scan_workers}') as s:
+            s['dosya'] = sum(1 for _ in kale.kale_tarayici(kok, args.scan_workers))
+    toplam_bayt = sum(k.boyut for k in kayitlar)
+
+    with olcer.faz('sha256') as s:
+        for k in kayitlar:
+            kale.sha256_hesapla(k.yol)
+        s['dosya'], s['bayt'] = len(kayitlar), toplam_bayt
+
+    ek_arg = {'3': ','.join(KELIMELER[:3]), '16': str(max(toplam_bayt // (2 * 1024 * 1024), 1))}
+    secimler = [m.strip() for m in args.modules.split(',') if m.strip()]
+    hedefler = {}
+    for secim in secimler:
+        ad = 'kopya_tespiti' if secim == '12' else f'modul_{secim}'
+        bulunan = []
+        with olcer.faz(ad) as s:
+            moduller = kale.modulleri_hazirla(secim, ek_arg)
+            if not moduller: continue
+            siniflandirici = kale.Siniflandirici(moduller)
+            for k in kayitlar:
+                siniflandirici.dagit(k)
+            bulunan = moduller[0].bitir() or []
+            s['dosya'] = len(kayitlar)
+            if secim == '12':
+                sayac = moduller[0].sayaclar
+                s['bayt'] = sayac['ornek_okunan_bayt'] + sayac['tam_hash_okunan_bayt']
+                s['okunmayan_bayt'] = sayac['boyut_eleme_bayt'] + sayac['hardlink_bayt'] + sayac['ornek_eleme_bayt']
+            s['eslesen'] = len(bulunan)
+        hedefler[secim] = bulunan
+
+    karantina = {}
+    for secim in args.quarantine_modules.split(','):
+        for k in hedefler.get(secim.strip(), ()):
+            karantina.setdefault(k.yol, k)
+    karantina = list(karantina.values())
+    karantina_bayt = sum(k.boyut for k in karantina)
+
+    if karantina:
+        with olcer.faz('snapshot') as s:
+            kale.snapshot_olustur(karantina, kok, hash_dahil=True)
+            s['dosya'], s['bayt'] = len(karantina), karantina_bayt
+        with olcer.faz('karantina') as s:
+            kasa = kale.KarantinaKasasi(kok)
+            s['tasinan'] = sum(1 for _, hedef in kasa.toplu_tasi(karantina, args.move_workers) if hedef)
+            s['dosya'], s['bayt'] = len(karantina), karantina_bayt
+        with olcer.faz('geri_yukleme') as s:
+            kasa.dogrula_ve_geri_yukle(args.move_workers)
+            s['dosya'], s['bayt'] = len(karantina), karantina_bayt
+        snapshot = kok / f"snapshot_{kasa.oturum}.db"
+        if snapshot.exists(): snapshot.unlink()
+    kale.denetim_durdur(denetim)
+
+    sonuc = {
+        'zaman': datetime.now().isoformat(timespec='seconds'),
+        'ortam': {'python': platform.python_version(), 'platform': platform.platform(),
+                  'islemci': os.cpu_count()},
+        'agac': agac_bilgisi,
+        'ayarlar': {'moduller': args.modules, 'karantina_modulleri': args.quarantine_modules,
+                    'tarama_iscisi': args.scan_workers, 'tasima_iscisi': args.move_workers},
+        'fazlar': olcer.fazlar,
+    }
+    if args.compare:
+        karsilastir(args.compare, olcer.fazlar)
+    if not args.workdir and not args.keep:
+        os.chdir(Path.home())
+        shutil.rmtree(calisma_dizini, ignore_errors=True)
+    return sonuc
+
+def main():
+    parser = argparse.ArgumentParser(description="KALE Temizlik Aracı - Sentetik Ağaç Üzerinde Performans Ölçümü")
+    parser.add_argument('--files', type=int, default=20000, help="Üretilecek dosya sayısı")
+    parser.add_argument('--depth', type=int, default=4, help="Dizin derinliği")
+    parser.add_argument('--width', type=int, default=4, help="Her dizindeki alt dizin sayısı")
+    parser.add_argument('--median-size', type=int, default=16 * 1024, help="Medyan dosya boyutu (bayt, log-normal)")
+    parser.add_argument('--max-size', type=int, default=8 * 1024 * 1024, help="Azami dosya boyutu (bayt)")
+    parser.add_argument('--dup-ratio', type=float, default=0.1, help="Kopya içerikli dosya oranı")
+    parser.add_argument('--hex-ratio', type=float, default=0.05, help="32-hex isimli dosya oranı")
+    parser.add_argument('--lock-ratio', type=float, default=0.02, help="~$ ile başlayan dosya oranı")
+    parser.add_argument('--empty-ratio', type=float, default=0.02, help="0 baytlık dosya oranı")
+    parser.add_argument('--old-ratio', type=float, default=0.1, help="6 aydan eski dosya oranı")
+    parser.add_argument('--seed', type=int, default=42, help="Rastgelelik tohumu (tekrarlanabilirlik)")
+    parser.add_argument('--workdir', help="Ağacın üretileceği/yeniden kullanılacağı dizin")
+    parser.add_argument('--regenerate', action='store_true', help="Parametreler aynı olsa da ağacı yeniden üret")
+    parser.add_argument('--keep', action='store_true', help="Geçici çalışma dizinini silme")
+    parser.add_argument('--modules', default=VARSAYILAN_MODULLER, help="Ölçülecek modüller (virgülle)")
+    parser.add_argument('--quarantine-modules', default='8,12', help="Karantina/geri yükleme için hedef modüller")
+    parser.add_argument('--scan-workers', type=int, default=4, help="Paralel tarama ölçümü için iş parçacığı")
+    parser.add_argument('--move-workers', type=int, default=4, help="Karantina/geri yükleme iş parçacığı")
+    parser.add_argument('--output', help="JSON sonucun yazılacağı dosya (varsayılan: stdout)")
+    parser.add_argument('--compare', help="Karşılaştırılacak önceki JSON sonuç dosyası")
+    parser.add_argument('--startup', action='store_true',
+                        help="Yalnızca başlangıç süresini ölç (yorumlayıcı, içe aktarma, --help ve -m ile --help; ağaç üretilmez)")
+    parser.add_argument('--startup-runs', type=int, default=20, help="Başlangıç ölçümünde her komutun tekrar sayısı")
+    args = parser.parse_args()
+
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    if args.compare:
+        args.compare = os.path.abspath(args.compare)
+    sonuc = baslangic_olc(args) if args.startup else calistir(args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(sonuc, f, indent=2, ensure_ascii=False)
+        print(f"\nSonuç yazıldı: {args.output}", file=sys.stderr)
+    else:
+        json.dump(sonuc, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+if __name__ == "__main__":
+    main()
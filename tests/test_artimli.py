@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import toplutemizlik as kale
+
+
+class ArtimliTaramaTesti(unittest.TestCase):
+    def setUp(self):
+        self.gecici = tempfile.TemporaryDirectory()
+        self.kok = Path(self.gecici.name).resolve() / "agac"
+        (self.kok / "a").mkdir(parents=True)
+        (self.kok / "a" / "x.txt").write_bytes(b"abc")
+        (self.kok / "a" / "y.tmp").write_bytes(b"q")
+        eski = time.time() - 60
+        for yol in (self.kok / "a", self.kok):
+            os.utime(yol, (eski, eski))
+        self.indeks = kale.DizinIndeksi(Path(self.gecici.name) / "indeks.sqlite")
+
+    def tearDown(self):
+        self.indeks.kapat()
+        self.gecici.cleanup()
+
+    def tara(self, kapsam="7"):
+        sonuc = {os.path.basename(k.yol): (k.boyut, degisti) for k, degisti in self.indeks.tara(self.kok, kapsam=kapsam)}
+        self.indeks.kaydet()
+        return sonuc
+
+    def test_yerinde_duzenlenen_dosya_degisti_olarak_gelir(self):
+        self.assertEqual(self.tara(), {"x.txt": (3, True), "y.tmp": (1, True)})
+        self.assertEqual(self.tara(), {"x.txt": (3, False), "y.tmp": (1, False)})
+        dizin_mtime = os.stat(self.kok / "a").st_mtime_ns
+        with open(self.kok / "a" / "x.txt", "r+b") as f:
+            f.truncate(0)
+        os.utime(self.kok / "a", ns=(dizin_mtime, dizin_mtime))
+
+        self.assertEqual(self.tara(), {"x.txt": (0, True), "y.tmp": (1, False)})
+        self.assertEqual(self.tara(), {"x.txt": (0, False), "y.tmp": (1, False)})
+
+    def test_kaydedilmeyen_tarama_dosyalari_yeniden_degerlendirir(self):
+        list(self.indeks.tara(self.kok, kapsam="8"))
+        self.indeks.vazgec()
+        self.assertTrue(all(degisti for _, degisti in self.tara("8").values()))
+
+    def test_kapsamlar_birbirini_etkilemez(self):
+        self.tara("8")
+        self.assertTrue(all(degisti for _, degisti in self.tara("15").values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import toplutemizlik as kale
+
+
+class IcerikAdresliKasaTesti(unittest.TestCase):
+    def setUp(self):
+        self.gecici = tempfile.TemporaryDirectory()
+        self.kok = Path(self.gecici.name).resolve()
+
+    def tearDown(self):
+        self.gecici.cleanup()
+
+    def dosya(self, ad, icerik):
+        (self.kok / ad).write_bytes(icerik)
+        return kale.DosyaKaydi.yoldan(str(self.kok / ad))
+
+    def test_secildikten_sonra_degisen_dosya_tekillestirilmez(self):
+        kayitlar = [self.dosya(f"f{i}.dat", b"eski icerik" * 100) for i in range(2)]
+        hashler = {k.yol: hashlib.sha256(b"eski icerik" * 100).hexdigest() for k in kayitlar}
+        (self.kok / "f1.dat").write_bytes(b"YENI icerik!" * 100)
+
+        kasa = kale.KarantinaKasasi(self.kok, icerik_adresli=True, oturum="T")
+        sonuc = {os.path.basename(k.yol): h for k, h in kasa.toplu_tasi(kayitlar, 1, hashler=hashler)}
+
+        self.assertIsNotNone(sonuc["f0.dat"])
+        self.assertIsNone(sonuc["f1.dat"])
+        self.assertEqual((self.kok / "f1.dat").read_bytes(), b"YENI icerik!" * 100)
+
+    def test_ayni_boyut_ve_mtime_ile_degisen_dosya_silinmez(self):
+        kayitlar = [self.dosya(f"f{i}.dat", b"eski" * 100) for i in range(2)]
+        h = hashlib.sha256(b"eski" * 100).hexdigest()
+        st = os.stat(self.kok / "f1.dat")
+        (self.kok / "f1.dat").write_bytes(b"yeni" * 100)
+        os.utime(self.kok / "f1.dat", ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        kasa = kale.KarantinaKasasi(self.kok, icerik_adresli=True, oturum="T")
+        sonuc = dict(kasa.toplu_tasi(kayitlar, 1, hashler={k.yol: h for k in kayitlar}))
+
+        self.assertIsNone(sonuc[kayitlar[1]])
+        self.assertEqual((self.kok / "f1.dat").read_bytes(), b"yeni" * 100)
+
+    def test_adiyla_uyusmayan_nesneye_tekillestirme_yapilmaz(self):
+        b = self.dosya("b", b"yeni")
+        a = self.dosya("a", b"eski")
+        h = hashlib.sha256(b"eski").hexdigest()
+
+        kasa = kale.KarantinaKasasi(self.kok, icerik_adresli=True, oturum="T")
+        sonuc = dict(kasa.toplu_tasi([b, a], 1, hashler={b.yol: h, a.yol: h}))
+
+        self.assertIsNone(sonuc[a])
+        self.assertEqual((self.kok / "a").read_bytes(), b"eski")
+
+
+if __name__ == '__main__':
+    unittest.main()
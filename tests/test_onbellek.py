@@ -0,0 +1,78 @@
+import os
+import sys
+import sqlite3
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import toplutemizlik as kale
+
+
+class HashOnbellegiTesti(unittest.TestCase):
+    def setUp(self):
+        self.gecici = tempfile.TemporaryDirectory()
+        self.kok = Path(self.gecici.name).resolve()
+        self.yol = self.kok / kale.HASH_ONBELLEK_DOSYASI
+
+    def tearDown(self):
+        self.gecici.cleanup()
+
+    def kayit(self, i):
+        return kale.DosyaKaydi(str(self.kok / f"f{i}"), f"f{i}", i, i, i, 1)
+
+    def test_hash_yazilmadikca_dosya_olusturulmaz(self):
+        onbellek = kale.HashOnbellegi(self.yol)
+        self.assertIsNone(onbellek.getir(self.kayit(1)))
+        onbellek.kapat()
+        self.assertFalse(self.yol.exists())
+
+    def test_yazilmamis_kayit_tampondan_bulunur(self):
+        onbellek = kale.HashOnbellegi(self.yol)
+        onbellek.kaydet(self.kayit(1), "abc")
+        self.assertEqual(onbellek.getir(self.kayit(1)), "abc")
+        self.assertFalse(self.yol.exists())
+        onbellek.kapat()
+
+        onbellek = kale.HashOnbellegi(self.yol)
+        self.assertEqual(onbellek.getir(self.kayit(1)), "abc")
+        onbellek.kapat()
+
+    def test_kayit_sayisi_calisma_sirasinda_sinirlanir(self):
+        onbellek = kale.HashOnbellegi(self.yol, azami_kayit=100)
+        for i in range(2500):
+            onbellek.kaydet(self.kayit(i), str(i))
+        with sqlite3.connect(self.yol) as baglanti:
+            self.assertLessEqual(baglanti.execute("SELECT COUNT(*) FROM hashler").fetchone()[0], 100)
+        onbellek.kapat()
+
+
+class GeriYuklemeDogrulamaTesti(unittest.TestCase):
+    def setUp(self):
+        self.gecici = tempfile.TemporaryDirectory()
+        self.kok = Path(self.gecici.name).resolve()
+
+    def tearDown(self):
+        self.gecici.cleanup()
+
+    def test_bozulan_kasa_dosyasi_sicak_onbellege_ragmen_yakalanir(self):
+        onbellek = kale.HashOnbellegi(self.kok / kale.HASH_ONBELLEK_DOSYASI)
+        kasa = kale.KarantinaKasasi(self.kok, onbellek, oturum="T")
+        kaynak = kasa.karantina_dizini / "a.txt"
+        kaynak.parent.mkdir()
+        kaynak.write_bytes(b"saglam")
+        h = hashlib.sha256(b"saglam").hexdigest()
+        onbellek.kaydet(kale.DosyaKaydi.yoldan(str(kaynak)), h)
+
+        st = os.stat(kaynak)
+        kaynak.write_bytes(b"BOZUKK")
+        os.utime(kaynak, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        self.assertEqual(kasa._geri_yukle(("a.txt", str(kaynak), h, st.st_mtime)), 'BOZUK')
+        self.assertFalse((self.kok / "a.txt").exists())
+        onbellek.kapat()
+
+
+if __name__ == '__main__':
+    unittest.main()
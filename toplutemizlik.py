@@ -1,35 +1,241 @@
 import os
 import sys
+import errno
 import re
 import time
-import json
-import shutil
+import fnmatch
 import hashlib
+import sqlite3
 import logging
+import atexit
 import heapq
-import argparse
-import platform
-import concurrent.futures
+import bisect
+import zlib
+import array
+import stat
+import struct
+import itertools
+import queue
+import threading
+import contextlib
 from datetime import datetime
 from pathlib import Path
-from collections import Counter
-
-OTURUM_ID = datetime.now().strftime('%Y%m%d_%H%M%S')
-LOG_DOSYASI = f"kale_gunluk_{OTURUM_ID}.log"
-DENETIM_DOSYASI = f"kale_gunluk_{OTURUM_ID}.log.sha256"
-KARANTINA_KLASORU = f".karantina_{OTURUM_ID}"
-SNAPSHOT_DOSYASI = f"snapshot_{OTURUM_ID}.json"
-IO_GECIKMESI = 0.001
-
-logging.basicConfig(
-    filename=LOG_DOSYASI,
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s',
-    encoding='utf-8'
-)
+from collections import Counter, deque
+
+TASIMA_ISCISI = 4
+HASH_ISCISI = min(32, (os.cpu_count() or 1) + 4)
+AKIS_KUYRUK_BOYUTU = 1024
+AKIS_PARTI_BOYUTU = 256
+KOPYA_HASH_ALGORITMASI = 'sha256'
+KOPYA_BELLEK_BUTCESI_MB = None
+KOPYA_TASMA_DIZINI = None
+KOPYA_KAYIT_BELLEK_TAHMINI = 400
+IZLEME_ARALIGI = 60
+IZLEME_BEKLEYEN_SINIRI = 100_000
+IZLEME_OTURUM_SURESI = 3600
+TARAMA_KUYRUK_BOYUTU = 256
+ORNEK_BOYUTU = 4096
+HASH_ONBELLEK_DOSYASI = ".kale_hash_onbellek.sqlite"
+HASH_ONBELLEK_LIMITI = 1_000_000
+KASA_NESNE_DIZINI = "nesneler"
+KASA_SOGUK_GUN = 30
+SIKISTIRMA_UZANTILARI = {'zlib': '.zz', 'lzma': '.xz'}
+KASA_NESNE_DESENI = re.compile(KASA_NESNE_DIZINI + r'/[0-9a-f]{2}/([0-9a-f]{64})(\.zz|\.xz)?')
+SIKISTIRILMIS_UZANTILAR = {'.zip', '.gz', '.7z', '.rar', '.xz', '.bz2', '.zst', '.jpg', '.jpeg', '.png', '.webp',
+                           '.mp3', '.mp4', '.mkv', '.avi', '.mov', '.docx', '.xlsx', '.pptx'}
+GERI_YUKLEME_GUNLUGU = ".geri_yukleme_gunlugu.db"
+DIZIN_INDEKSI_DOSYASI = ".kale_dizin_indeksi.sqlite"
+KASA_INDEKSI_DOSYASI = ".kale_kasa_indeksi.sqlite"
+KALE_DOSYA_DESENI = re.compile(
+    rf'^({re.escape(HASH_ONBELLEK_DOSYASI)}|{re.escape(DIZIN_INDEKSI_DOSYASI)}|{re.escape(KASA_INDEKSI_DOSYASI)}|'
+    rf'snapshot_\d{{8}}_\d{{6}}(_\d+)?\.(db|json))(-journal|-wal|-shm)?$')
+KASA_KOMUTLARI = ('restore', 'list', 'search', 'purge')
+OTURUM_KLASOR_DESENI = re.compile(r'^\.karantina_(\d{8}_\d{6}(?:_\d+)?)$')
+_VARSAYILAN_OTURUM = None
+
+def yeni_oturum_id(kok_dizin=None):
+    temel = datetime.now().strftime('%Y%m%d_%H%M%S')
+    oturum, sira = temel, 1
+    while kok_dizin is not None and (os.path.lexists(os.path.join(kok_dizin, f".karantina_{oturum}")) or
+                                     os.path.lexists(os.path.join(kok_dizin, f"snapshot_{oturum}.db"))):
+        sira += 1
+        oturum = f"{temel}_{sira}"
+    return oturum
+
+def varsayilan_oturum_id():
+    global _VARSAYILAN_OTURUM
+    if _VARSAYILAN_OTURUM is None:
+        _VARSAYILAN_OTURUM = yeni_oturum_id()
+    return _VARSAYILAN_OTURUM
+
+GUNLUK = logging.getLogger('kale')
+GUNLUK.addHandler(logging.NullHandler())
+GUNLUK_PARTI_BOYUTU = 1000
+GUNLUK_MUHUR_ARALIGI = 1.0
+ZINCIR_AYRACI = ' | #'
+
+def _zincir_adimi(onceki: bytes, metin: str):
+    return hashlib.sha256(onceki + metin.encode('utf-8', 'backslashreplace')).digest()
+
+def gunluk_zincirini_dogrula(yol):
+    zincir, satir_no = bytes(32), 0
+    with open(yol, 'r', encoding='utf-8', errors='surrogateescape', newline='\n') as f:
+        for satir in f:
+            metin, ayrac, etiket = satir.rstrip('\n').rpartition(ZINCIR_AYRACI)
+            if not ayrac:
+                return zincir, satir_no, satir_no + 1
+            yeni = _zincir_adimi(zincir, metin)
+            if yeni.hex()[:16] != etiket:
+                return zincir, satir_no, satir_no + 1
+            zincir, satir_no = yeni, satir_no + 1
+    return zincir, satir_no, None
+
+class DenetimKuyrukIsleyici(logging.Handler):
+    def __init__(self, kuyruk):
+        super().__init__()
+        self.kuyruk = kuyruk
+
+    def emit(self, record):
+        try:
+            if record.args:
+                record.msg = record.getMessage()
+                record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self.kuyruk.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+class DenetimGunlugu:
+    def __init__(self, yol, muhur_yolu):
+        self.yol = yol
+        self.muhur_yolu = muhur_yolu
+        self.kuyruk = queue.SimpleQueue()
+        self.son_saniye = None
+        self.son_zaman = ''
+        self.isleyici = DenetimKuyrukIsleyici(self.kuyruk)
+        self.zincir = bytes(32)
+        self.satir = 0
+        self.muhurlenen = 0
+        self.son_muhur = 0.0
+        self.dosya = None
+        self.iplik = None
+        self.hatalar = 0
+        self.kullanan = 0
+
+    def baslat(self):
+        GUNLUK.addHandler(self.isleyici)
+        GUNLUK.setLevel(logging.INFO)
+        self.iplik = threading.Thread(target=self._calis, name="kale-denetim", daemon=True)
+        self.iplik.start()
+        atexit.register(self.durdur)
+
+    def _ac(self):
+        if os.path.exists(self.yol):
+            self.zincir, self.satir, _ = gunluk_zincirini_dogrula(self.yol)
+        self.dosya = open(self.yol, 'a', encoding='utf-8', errors='backslashreplace', newline='\n')
+
+    def _calis(self):
+        while True:
+            parti = [self.kuyruk.get()]
+            try:
+                while len(parti) < GUNLUK_PARTI_BOYUTU:
+                    parti.append(self.kuyruk.get_nowait())
+            except queue.Empty:
+                pass
+            if self._yaz(parti): return
+
+    def _bicimle(self, kayit: logging.LogRecord):
+        saniye = int(kayit.created)
+        if saniye != self.son_saniye:
+            self.son_saniye = saniye
+            self.son_zaman = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(saniye))
+        metin = f"{self.son_zaman},{int(kayit.msecs):03d} | {kayit.levelname} | {kayit.getMessage()}"
+        return f"{metin}\n{kayit.exc_text}" if kayit.exc_text else metin
+
+    def _satir(self, kayit: logging.LogRecord):
+        try:
+            metin = self._bicimle(kayit)
+        except Exception as e:
+            metin = f"{self.son_zaman} | ERROR | DENETIM KAYDI BICIMLENEMEDI: {e!r}"
+        return metin.replace('\r', '\\r').replace('\n', '\\n')
+
+    def _yaz(self, parti):
+        bekleyenler = [oge for oge in parti if isinstance(oge, threading.Event)]
+        dur = any(oge is None for oge in parti)
+        kayitlar = [oge for oge in parti if isinstance(oge, logging.LogRecord)]
+        try:
+            if kayitlar:
+                if self.dosya is None: self._ac()
+                zincir, satirlar = self.zincir, []
+                for kayit in kayitlar:
+                    metin = self._satir(kayit)
+                    zincir = _zincir_adimi(zincir, metin)
+                    satirlar.append(f"{metin}{ZINCIR_AYRACI}{zincir.hex()[:16]}\n")
+                self.dosya.writelines(satirlar)
+                self.dosya.flush()
+                self.zincir = zincir
+                self.satir += len(satirlar)
+            if self.satir != self.muhurlenen and (bekleyenler or dur or
+                                                  time.monotonic() - self.son_muhur >= GUNLUK_MUHUR_ARALIGI):
+                self._muhurle()
+        except Exception as e:
+            self.hatalar += 1
+            sys.stderr.write(f"Denetim günlüğü yazılamadı ({len(kayitlar)} kayıt): {e!r}\n")
+        for olay in bekleyenler: olay.set()
+        return dur
+
+    def _muhurle(self):
+        gecici = f"{self.muhur_yolu}.tmp"
+        with open(gecici, "w") as f:
+            f.write(f"{datetime.now()}|{self.zincir.hex()}|{self.satir}")
+        os.replace(gecici, self.muhur_yolu)
+        self.muhurlenen = self.satir
+        self.son_muhur = time.monotonic()
+
+    def muhurle(self, zaman_asimi=30):
+        if self.iplik is None or not self.iplik.is_alive(): return
+        olay = threading.Event()
+        self.kuyruk.put(olay)
+        olay.wait(zaman_asimi)
+
+    def durdur(self):
+        if self.iplik is None: return
+        atexit.unregister(self.durdur)
+        GUNLUK.removeHandler(self.isleyici)
+        if not any(isinstance(h, DenetimKuyrukIsleyici) for h in GUNLUK.handlers):
+            GUNLUK.setLevel(logging.NOTSET)
+        if self.iplik.is_alive():
+            self.kuyruk.put(None)
+            self.iplik.join(30)
+        self.iplik = None
+        if self.dosya:
+            self.dosya.close()
+            self.dosya = None
+
+DENETIMLER = {}
+DENETIM_KILIDI = threading.Lock()
+
+def denetim_baslat(oturum_id: str, dizin=None):
+    yol = os.path.join(dizin or os.curdir, f"kale_gunluk_{oturum_id}.log")
+    with DENETIM_KILIDI:
+        gunluk = DENETIMLER.get(yol)
+        if gunluk is None:
+            gunluk = DENETIMLER[yol] = DenetimGunlugu(yol, yol + ".sha256")
+            gunluk.baslat()
+        gunluk.kullanan += 1
+    return gunluk
+
+def denetim_durdur(gunluk: DenetimGunlugu):
+    with DENETIM_KILIDI:
+        gunluk.kullanan -= 1
+        if gunluk.kullanan > 0: return
+        if DENETIMLER.get(gunluk.yol) is gunluk: del DENETIMLER[gunluk.yol]
+    gunluk.durdur()
 
 def sunucu_modu_mu():
-    if platform.system() == "Linux":
+    if sys.platform.startswith('linux'):
         return os.environ.get('DISPLAY') is None
     return False
 
@@ -37,7 +243,7 @@ def yasakli_yollari_getir():
     yollar = set()
     kullanici_ana_dizin = Path(os.path.expanduser("~")).resolve()
     
-    if platform.system() == "Windows":
+    if os.name == 'nt':
         yollar.add(Path(os.environ.get("SystemRoot", r"C:\Windows")).resolve())
         yollar.add(Path(os.environ.get("ProgramFiles", r"C:\Program Files")).resolve())
         yollar.add(Path(os.environ.get("ProgramData", r"C:\ProgramData")).resolve())
@@ -50,7 +256,13 @@ def yasakli_yollari_getir():
         yollar.add(kullanici_ana_dizin)
     return list(yollar)
 
-KORUNAN_YOLLAR = yasakli_yollari_getir()
+_KORUNAN_YOLLAR = None
+
+def korunan_yollar():
+    global _KORUNAN_YOLLAR
+    if _KORUNAN_YOLLAR is None:
+        _KORUNAN_YOLLAR = yasakli_yollari_getir()
+    return _KORUNAN_YOLLAR
 
 def guvenli_yol_mu(hedef_yol: Path):
     try:
@@ -64,387 +276,2768 @@ def guvenli_yol_mu(hedef_yol: Path):
         return False, "Kullanıcı Ana Dizini (Root) Seçilemez"
 
     if hedef.is_relative_to(kullanici_ana_dizin):
-        if platform.system() == "Windows" and hedef.is_relative_to(kullanici_ana_dizin / "AppData"):
+        if os.name == 'nt' and hedef.is_relative_to(kullanici_ana_dizin / "AppData"):
              return False, "AppData (Sistem Verisi)"
         return True, "UYGUN (Kullanıcı Alanı)"
 
-    for korunan in KORUNAN_YOLLAR:
+    for korunan in korunan_yollar():
         if hedef == korunan or hedef.is_relative_to(korunan):
             return False, f"Sistem Dizini ({korunan})"
 
     return True, "UYGUN"
 
-def sha256_hesapla(dosya_yolu, blok_boyutu=65536):
-    sha = hashlib.sha256()
+class Olcumler:
+    def __init__(self):
+        self.etkin = False
+        self.kilit = threading.Lock()
+        self.sayaclar = Counter()
+        self.sureler = Counter()
+        self.baslangic = time.time()
+
+    def artir(self, ad: str, miktar=1):
+        if not self.etkin: return
+        with self.kilit:
+            self.sayaclar[ad] += miktar
+
+    @contextlib.contextmanager
+    def faz(self, ad: str):
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.etkin:
+                with self.kilit:
+                    self.sureler[ad] += time.perf_counter() - baslangic
+
+    def ozet(self, onbellek=None, oturum=None):
+        sayaclar = dict(self.sayaclar)
+        if onbellek:
+            sayaclar['hash_onbellek_isabet'] = onbellek.isabet
+            sayaclar['hash_onbellek_iskalama'] = onbellek.iskalama
+        return {'oturum': oturum, 'toplam_sure_sn': round(time.time() - self.baslangic, 3),
+                'fazlar': {ad: round(sure, 4) for ad, sure in self.sureler.items()}, 'sayaclar': sayaclar}
+
+    def yazdir(self, ozet):
+        print("\n" + "="*40)
+        print(f" İSTATİSTİKLER ({ozet['toplam_sure_sn']:.2f} sn)")
+        print("="*40)
+        for ad, sure in sorted(ozet['fazlar'].items(), key=lambda x: -x[1]):
+            print(f" {ad:<28} {sure:10.3f} sn")
+        print("-" * 40)
+        for ad, deger in sorted(ozet['sayaclar'].items()):
+            print(f" {ad:<28} {deger:>14,}")
+
+    def prometheus_yaz(self, ozet, yol: str, kok: str):
+        kacis = lambda d: str(d).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        etiket = f'kok="{kacis(kok)}"'
+        satirlar = ['# HELP kale_faz_sure_saniye Son çalışmada fazın toplam duvar saati süresi.',
+                    '# TYPE kale_faz_sure_saniye gauge']
+        for ad, sure in ozet['fazlar'].items():
+            satirlar.append(f'kale_faz_sure_saniye{{{etiket},faz="{kacis(ad)}"}} {sure}')
+        for ad, deger in sorted(ozet['sayaclar'].items()):
+            satirlar.append(f'# TYPE kale_{ad} gauge')
+            satirlar.append(f'kale_{ad}{{{etiket}}} {deger}')
+        satirlar.append('# TYPE kale_son_calisma_zamani_saniye gauge')
+        satirlar.append(f'kale_son_calisma_zamani_saniye{{{etiket}}} {self.baslangic:.0f}')
+        gecici = f"{yol}.{os.getpid()}.tmp"
+        with open(gecici, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(satirlar) + '\n')
+        os.replace(gecici, yol)
+
+OLCUMLER = Olcumler()
+
+HASH_ALGORITMALARI = {'sha256': hashlib.sha256, 'blake2b': hashlib.blake2b}
+FADVISE_ESIGI = 8 * 1024 * 1024
+_hash_tamponlari = threading.local()
+
+def _blok_boyutu_sec(boyut: int):
+    if boyut < 1024 * 1024: return 64 * 1024
+    if boyut < 32 * 1024 * 1024: return 256 * 1024
+    return 1024 * 1024
+
+def _okuma_tavsiyesi(fd: int, tavsiye: str):
+    if not hasattr(os, 'posix_fadvise'): return
     try:
-        with open(dosya_yolu, 'rb') as f:
-            while True:
-                veri = f.read(blok_boyutu)
-                if not veri: break
-                sha.update(veri)
-        return sha.hexdigest()
-    except: return None
+        os.posix_fadvise(fd, 0, 0, getattr(os, tavsiye))
+    except OSError: pass
+
+def hash_hesapla(dosya_yolu, algoritma='sha256', boyut=None):
+    h = HASH_ALGORITMALARI[algoritma]()
+    with open(dosya_yolu, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        if boyut is None: boyut = os.fstat(fd).st_size
+        if boyut >= FADVISE_ESIGI: _okuma_tavsiyesi(fd, 'POSIX_FADV_SEQUENTIAL')
+
+        blok = _blok_boyutu_sec(boyut)
+        tampon = getattr(_hash_tamponlari, 'tampon', None)
+        if tampon is None or len(tampon) < blok:
+            tampon = _hash_tamponlari.tampon = memoryview(bytearray(blok))
+        tampon = tampon[:blok]
+        okunan = 0
+        while n := f.readinto(tampon):
+            h.update(tampon[:n])
+            okunan += n
+    OLCUMLER.artir('hash_dosya')
+    OLCUMLER.artir('hash_bayt', okunan)
+    return h.hexdigest()
+
+def sha256_hesapla(dosya_yolu):
+    try:
+        return hash_hesapla(dosya_yolu, 'sha256')
+    except OSError as e:
+        GUNLUK.error(f"HASH HATASI: {dosya_yolu} -> {e}")
+        return None
+
+def ornek_hash_hesapla(dosya_yolu, boyut: int, ornek_boyutu=None):
+    ornek_boyutu = ornek_boyutu or ORNEK_BOYUTU
+    h = hashlib.blake2b(digest_size=16)
+    with open(dosya_yolu, 'rb') as f:
+        if boyut <= 2 * ornek_boyutu:
+            h.update(f.read())
+        else:
+            h.update(f.read(ornek_boyutu))
+            f.seek(-ornek_boyutu, os.SEEK_END)
+            h.update(f.read(ornek_boyutu))
+    OLCUMLER.artir('ornek_hash_dosya')
+    OLCUMLER.artir('ornek_hash_bayt', min(boyut, 2 * ornek_boyutu))
+    return h.hexdigest()
+
+class DosyaKaydi:
+    __slots__ = ('yol', 'isim', 'boyut', 'mtime_ns', 'inode', 'cihaz')
+
+    def __init__(self, yol: str, isim: str, boyut: int, mtime_ns: int, inode: int, cihaz: int):
+        self.yol = yol
+        self.isim = isim
+        self.boyut = boyut
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+        self.cihaz = cihaz
+
+    @classmethod
+    def girdiden(cls, girdi: os.DirEntry, cihaz: int):
+        st = girdi.stat(follow_symlinks=False)
+        return cls(girdi.path, girdi.name, st.st_size, st.st_mtime_ns, girdi.inode(), cihaz)
+
+    @classmethod
+    def yoldan(cls, yol):
+        yol = os.fspath(yol)
+        st = os.stat(yol, follow_symlinks=False)
+        return cls(yol, os.path.basename(yol), st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+
+    @property
+    def govde(self):
+        return os.path.splitext(self.isim)[0]
+
+    @property
+    def uzanti(self):
+        return os.path.splitext(self.isim)[1]
+
+    @property
+    def mtime(self):
+        return self.mtime_ns / 1e9
+
+    def __fspath__(self):
+        return self.yol
+
+    def __repr__(self):
+        return f"DosyaKaydi({self.yol!r}, {self.boyut})"
+
+def bagil_yol_hesapla(yol: str, kok: str, gercek=False):
+    yol = os.path.normpath(yol)
+    if gercek:
+        yol = os.path.join(os.path.realpath(os.path.dirname(yol)), os.path.basename(yol))
+    onek = kok if kok.endswith(os.sep) else kok + os.sep
+    if not yol.startswith(onek):
+        raise ValueError(f"{yol} kök dizin dışında: {kok}")
+    bagil = yol[len(onek):]
+    if not bagil or os.pardir in bagil.split(os.sep):
+        raise ValueError(f"{yol} kök dizin dışında: {kok}")
+    return bagil
+
+def db_yolu(yol: str):
+    if yol.isascii(): return yol
+    try:
+        yol.encode('utf-8')
+        return yol
+    except UnicodeEncodeError:
+        return os.fsencode(yol)
+
+def db_yolundan(deger):
+    return os.fsdecode(deger) if isinstance(deger, bytes) else deger
+
+def db_onek_kosulu(sutun: str, onek: str):
+    return (f"(({sutun} >= ? AND {sutun} < ?) OR (typeof({sutun}) = 'blob' AND substr({sutun}, 1, ?) = ?))",
+            [onek, onek + '\U0010ffff', len(os.fsencode(onek)), os.fsencode(onek)])
+
+class HashOnbellegi:
+    def __init__(self, yol, azami_kayit=HASH_ONBELLEK_LIMITI):
+        self.yol = str(yol)
+        self.azami_kayit = azami_kayit
+        self.kilit = threading.Lock()
+        self.yeni = {}
+        self.dokunulan = []
+        self.isabet = 0
+        self.iskalama = 0
+        self.baglanti = None
+        self.kayit_sayisi = 0
+        self.yazilamadi = False
+        if os.path.exists(self.yol): self._baglan()
+
+    def _baglan(self):
+        baglanti = sqlite3.connect(self.yol, check_same_thread=False)
+        try:
+            baglanti.execute(
+                "CREATE TABLE IF NOT EXISTS hashler ("
+                "cihaz INTEGER, inode INTEGER, boyut INTEGER, mtime_ns INTEGER, algoritma TEXT, "
+                "hash TEXT NOT NULL, kullanim REAL NOT NULL, "
+                "PRIMARY KEY (cihaz, inode, boyut, mtime_ns, algoritma))")
+            baglanti.execute("CREATE INDEX IF NOT EXISTS hashler_kullanim ON hashler (kullanim)")
+            self.kayit_sayisi = baglanti.execute("SELECT COUNT(*) FROM hashler").fetchone()[0]
+        except sqlite3.Error:
+            baglanti.close()
+            raise
+        self.baglanti = baglanti
+
+    @classmethod
+    def ac(cls, yol, azami_kayit=HASH_ONBELLEK_LIMITI):
+        try:
+            return cls(yol, azami_kayit)
+        except sqlite3.Error as e:
+            GUNLUK.warning(f"HASH ONBELLEGI ACILAMADI: {yol} -> {e}")
+            return None
+
+    def getir(self, kayit: DosyaKaydi, algoritma='sha256'):
+        anahtar = (kayit.cihaz, kayit.inode, kayit.boyut, kayit.mtime_ns, algoritma)
+        with self.kilit:
+            h = self.yeni.get(anahtar)
+            if h is None and self.baglanti is not None:
+                satir = self.baglanti.execute(
+                    "SELECT hash FROM hashler WHERE cihaz=? AND inode=? AND boyut=? AND mtime_ns=? AND algoritma=?",
+                    anahtar).fetchone()
+                if satir is not None:
+                    h = satir[0]
+                    self.dokunulan.append(anahtar)
+                    if len(self.dokunulan) >= 1000:
+                        self._bosalt()
+            if h is None:
+                self.iskalama += 1
+                return None
+            self.isabet += 1
+        return h
+
+    def kaydet(self, kayit: DosyaKaydi, h: str, algoritma='sha256'):
+        with self.kilit:
+            if self.yazilamadi: return
+            self.yeni[(kayit.cihaz, kayit.inode, kayit.boyut, kayit.mtime_ns, algoritma)] = h
+            if len(self.yeni) >= 1000:
+                self._bosalt()
+
+    def _bosalt(self):
+        try:
+            self._yaz()
+        except sqlite3.Error as e:
+            GUNLUK.warning(f"HASH ONBELLEGI YAZILAMADI: {self.yol} -> {e}")
+            self.yazilamadi = True
+            self.yeni = {}
+            self.dokunulan = []
+
+    def _yaz(self):
+        if not self.yeni and not self.dokunulan: return
+        if self.baglanti is None: self._baglan()
+        simdi = time.time()
+        self.baglanti.executemany(
+            "INSERT OR REPLACE INTO hashler VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [k + (h, simdi) for k, h in self.yeni.items()])
+        self.baglanti.executemany(
+            "UPDATE hashler SET kullanim=? WHERE cihaz=? AND inode=? AND boyut=? AND mtime_ns=? AND algoritma=?",
+            [(simdi,) + k for k in self.dokunulan])
+        self.kayit_sayisi += len(self.yeni)
+        if self.kayit_sayisi > self.azami_kayit:
+            self._buda()
+        self.baglanti.commit()
+        self.yeni = {}
+        self.dokunulan = []
+
+    def _buda(self):
+        self.kayit_sayisi = self.baglanti.execute("SELECT COUNT(*) FROM hashler").fetchone()[0]
+        fazla = self.kayit_sayisi - self.azami_kayit
+        if fazla > 0:
+            self.baglanti.execute(
+                "DELETE FROM hashler WHERE rowid IN "
+                "(SELECT rowid FROM hashler ORDER BY kullanim LIMIT ?)", (fazla,))
+            self.kayit_sayisi -= fazla
+
+    def kapat(self):
+        with self.kilit:
+            try:
+                self._bosalt()
+            finally:
+                if self.baglanti is not None: self.baglanti.close()
+                self.baglanti = None
+        GUNLUK.info(f"HASH ONBELLEGI | isabet={self.isabet} iskalama={self.iskalama}")
+
+def onbellekli_hash(kayit: DosyaKaydi, onbellek=None, algoritma='sha256'):
+    if onbellek:
+        h = onbellek.getir(kayit, algoritma)
+        if h: return h
+    h = hash_hesapla(kayit.yol, algoritma, kayit.boyut)
+    if onbellek: onbellek.kaydet(kayit, h, algoritma)
+    return h
+
+def onbellekli_ornek_hash(kayit: DosyaKaydi, onbellek=None):
+    if onbellek:
+        h = onbellek.getir(kayit, 'ornek')
+        if h: return h
+    h = ornek_hash_hesapla(kayit.yol, kayit.boyut)
+    if onbellek: onbellek.kaydet(kayit, h, 'ornek')
+    return h
+
+KRITIK_KELIMELER = ('backup', 'yedek', 'wallet', 'private', 'key', 'git', 'pass', 'sifre',
+                    'shadow', 'config', 'tez', 'final', 'proje')
+UZANTI_KURALLARI = {
+    **dict.fromkeys(['.tmp', '.log', '.chk', '.dmp', '.bak', '.old', '.thumbs'], (10, "DÜŞÜK (Çöp)")),
+    **dict.fromkeys(['.pyc', '.cache', '.ds_store'], (20, "DÜŞÜK (Önbellek)")),
+}
+KRITIK_ETIKET = (100, "KRİTİK (Yasaklı Kelime)")
+VARSAYILAN_ETIKET = (50, "ORTA (Standart Dosya)")
+TOPLU_DEGERLENDIRME_BOYUTU = 4096
+
+def trie_deseni(kelimeler):
+    trie = {}
+    for kelime in kelimeler:
+        dugum = trie
+        for harf in kelime:
+            dugum = dugum.setdefault(harf, {})
+        dugum[''] = {}
+
+    def olustur(dugum):
+        dallar, tekler = [], []
+        for harf in sorted(h for h in dugum if h):
+            alt = olustur(dugum[harf])
+            if alt is None: tekler.append(re.escape(harf))
+            else: dallar.append(re.escape(harf) + alt)
+        if not dallar and not tekler:
+            return None
+        if tekler:
+            dallar.append(tekler[0] if len(tekler) == 1 else '[' + ''.join(tekler) + ']')
+        desen = dallar[0] if len(dallar) == 1 else '(?:' + '|'.join(dallar) + ')'
+        if '' in dugum:
+            desen = '(?:' + desen + ')?'
+        return desen
+
+    return olustur(trie) or ''
+
+def kelime_dosyasi_oku(yol):
+    kelimeler = []
+    with open(yol, 'r', encoding='utf-8') as f:
+        for satir in f:
+            satir = satir.strip()
+            if satir and not satir.startswith('#'):
+                kelimeler.extend(k.strip() for k in satir.split(','))
+    return [k.lower() for k in kelimeler if k]
 
 class RiskMotoru:
-    @staticmethod
-    def degerlendir(dosya_yolu: Path):
-        isim = dosya_yolu.name.lower()
-        
-        if re.search(r'\b(backup|yedek|wallet|private|key|git|pass|sifre|shadow|config|tez|final|proje)\b', isim):
-            return 100, "KRİTİK (Yasaklı Kelime)"
-                
-        uzanti = dosya_yolu.suffix.lower()
-        if uzanti in ['.tmp', '.log', '.chk', '.dmp', '.bak', '.old', '.thumbs']:
-            return 10, "DÜŞÜK (Çöp)"
-        if uzanti in ['.pyc', '.cache', '.ds_store']:
-            return 20, "DÜŞÜK (Önbellek)"
-            
-        return 50, "ORTA (Standart Dosya)"
+    def __init__(self, kritik_kelimeler=KRITIK_KELIMELER, uzanti_kurallari=None, desen_kurallari=()):
+        kelimeler = sorted({k.lower() for k in kritik_kelimeler if k})
+        self.kelime_deseni = re.compile(r'\b(?:' + trie_deseni(kelimeler) + r')\b') if kelimeler else None
+        self.uzanti_kurallari = dict(UZANTI_KURALLARI if uzanti_kurallari is None else uzanti_kurallari)
+        self.desen_etiketleri = [etiket for _, etiket in desen_kurallari]
+        self.desen_deseni = None
+        if desen_kurallari:
+            self.desen_deseni = re.compile('|'.join(
+                f'(?P<d{i}>{fnmatch.translate(glob.lower())})' for i, (glob, _) in enumerate(desen_kurallari)))
+
+    @classmethod
+    def dosyadan_yukle(cls, yol):
+        kelimeler = list(KRITIK_KELIMELER)
+        uzantilar = dict(UZANTI_KURALLARI)
+        desenler = []
+        with open(yol, 'r', encoding='utf-8') as f:
+            for no, satir in enumerate(f, 1):
+                parcalar = satir.split('#', 1)[0].split(None, 3)
+                if not parcalar: continue
+                try:
+                    if parcalar[0] == 'kelime' and len(parcalar) == 2:
+                        kelimeler.append(parcalar[1])
+                    elif parcalar[0] == 'uzanti' and len(parcalar) == 4:
+                        uzanti = parcalar[1].lower()
+                        uzantilar[uzanti if uzanti.startswith('.') else '.' + uzanti] = (int(parcalar[2]), parcalar[3].strip())
+                    elif parcalar[0] == 'desen' and len(parcalar) == 4:
+                        desenler.append((parcalar[1], (int(parcalar[2]), parcalar[3].strip())))
+                    else:
+                        raise ValueError(satir.strip())
+                except ValueError:
+                    raise ValueError(f"{yol}:{no}: geçersiz kural satırı: {satir.strip()}")
+        return cls(kelimeler, uzantilar, desenler)
+
+    def _isimden(self, isim: str):
+        if self.desen_deseni:
+            eslesme = self.desen_deseni.match(isim)
+            if eslesme:
+                return self.desen_etiketleri[int(eslesme.lastgroup[1:])]
+        return self.uzanti_kurallari.get(os.path.splitext(isim)[1], VARSAYILAN_ETIKET)
+
+    def degerlendir(self, kayit: DosyaKaydi):
+        isim = kayit.isim.lower()
+        if self.kelime_deseni and self.kelime_deseni.search(isim):
+            return KRITIK_ETIKET
+        return self._isimden(isim)
+
+    def toplu_degerlendir(self, kayitlar):
+        isimler = [k.isim.lower() for k in kayitlar]
+        kritik = set()
+        if self.kelime_deseni and isimler:
+            baslangiclar = []
+            konum = 0
+            for isim in isimler:
+                baslangiclar.append(konum)
+                konum += len(isim) + 1
+            for eslesme in self.kelime_deseni.finditer('\n'.join(isimler)):
+                kritik.add(bisect.bisect_right(baslangiclar, eslesme.start()) - 1)
+        return [KRITIK_ETIKET if i in kritik else self._isimden(isim) for i, isim in enumerate(isimler)]
+
+class SnapshotYazici:
+    def __init__(self, yol):
+        self.yol = str(yol)
+        self.bekleyen = []
+        self.baglanti = sqlite3.connect(self.yol)
+        self.baglanti.execute(
+            "CREATE TABLE IF NOT EXISTS kayitlar ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, hash TEXT, sebep TEXT, kasa_yolu TEXT)")
+        sutunlar = {satir[1] for satir in self.baglanti.execute("PRAGMA table_info(kayitlar)")}
+        if 'kasa_yolu' not in sutunlar:
+            self.baglanti.execute("ALTER TABLE kayitlar ADD COLUMN kasa_yolu TEXT")
+        self.baglanti.execute("CREATE INDEX IF NOT EXISTS kayitlar_kasa_yolu ON kayitlar (kasa_yolu)")
+
+    def ekle(self, rel: str, kayit: DosyaKaydi, h=None, sebep=None):
+        self.bekleyen.append((db_yolu(rel), kayit.boyut, kayit.mtime, h, sebep))
+        if len(self.bekleyen) >= 1000:
+            self.yaz()
+
+    def yaz(self):
+        self.baglanti.executemany(
+            "INSERT OR REPLACE INTO kayitlar (path, size, mtime, hash, sebep) VALUES (?, ?, ?, ?, ?)",
+            self.bekleyen)
+        self.baglanti.commit()
+        self.bekleyen = []
+
+    def kasa_yollari_yaz(self, yollar):
+        self.baglanti.executemany("UPDATE kayitlar SET kasa_yolu=? WHERE path=?",
+                                  [(db_yolu(kasa_rel), db_yolu(rel)) for kasa_rel, rel in yollar])
+        self.baglanti.commit()
+
+    def kapat(self):
+        try:
+            self.yaz()
+        finally:
+            self.baglanti.close()
+
+class SnapshotOkuyucu:
+    def __init__(self, baglanti=None, eski_veri=None):
+        self.baglanti = baglanti
+        self.eski_veri = eski_veri
+
+    @classmethod
+    def ac(cls, kok: Path, oturum=None):
+        import json
+        oturum = oturum or varsayilan_oturum_id()
+        yol = kok / f"snapshot_{oturum}.db"
+        if yol.exists():
+            try:
+                return cls(baglanti=sqlite3.connect(f"file:{yol}?mode=ro", uri=True))
+            except sqlite3.Error as e:
+                GUNLUK.error(f"SNAPSHOT OKUNAMADI: {yol} -> {e}")
+        eski_yol = kok / f"snapshot_{oturum}.json"
+        eski_veri = {}
+        if eski_yol.exists():
+            try:
+                with open(eski_yol, 'r', encoding='utf-8') as f:
+                    for oge in json.load(f):
+                        eski_veri[oge['path']] = oge.get('hash')
+            except (OSError, ValueError) as e:
+                GUNLUK.error(f"SNAPSHOT OKUNAMADI: {eski_yol} -> {e}")
+        return cls(eski_veri=eski_veri)
+
+    def hash_getir(self, rel: str):
+        if self.baglanti is None:
+            return self.eski_veri.get(rel)
+        satir = self.baglanti.execute("SELECT hash FROM kayitlar WHERE path=?", (db_yolu(rel),)).fetchone()
+        return satir[0] if satir else None
+
+    def kasa_yolu_var(self):
+        return 'kasa_yolu' in {satir[1] for satir in self.baglanti.execute("PRAGMA table_info(kayitlar)")}
+
+    def kayitlar(self, yol_oneki=None, sebep=None):
+        sorgu = "SELECT path, hash, " + ("kasa_yolu" if self.kasa_yolu_var() else "NULL") + ", mtime FROM kayitlar"
+        kosullar, degerler = [], []
+        if yol_oneki:
+            kosul, ek = db_onek_kosulu('path', yol_oneki)
+            kosullar.append(kosul)
+            degerler += ek
+        if sebep:
+            kosullar.append("sebep = ?")
+            degerler.append(sebep)
+        if kosullar:
+            sorgu += " WHERE " + " AND ".join(kosullar)
+        for rel, h, kasa_yolu, mtime in self.baglanti.execute(sorgu, degerler):
+            yield db_yolundan(rel), h, db_yolundan(kasa_yolu), mtime
+
+    def nesne_referanslari(self):
+        if self.baglanti is None or not self.kasa_yolu_var(): return
+        for kasa_yolu, rel in self.baglanti.execute(
+                "SELECT kasa_yolu, path FROM kayitlar WHERE kasa_yolu >= ? AND kasa_yolu < ? ORDER BY kasa_yolu",
+                (KASA_NESNE_DIZINI + '/', KASA_NESNE_DIZINI + '0')):
+            yield kasa_yolu, db_yolundan(rel)
+
+    def kapat(self):
+        if self.baglanti is not None:
+            self.baglanti.close()
+
+def oturum_zamani(oturum: str, varsayilan=None):
+    try:
+        return datetime.strptime(oturum[:15], '%Y%m%d_%H%M%S').timestamp()
+    except ValueError:
+        return varsayilan
+
+class KasaIndeksi:
+    def __init__(self, yol):
+        self.yol = str(yol)
+        self.bekleyen = []
+        self.baglanti = sqlite3.connect(self.yol, timeout=30)
+        self.baglanti.execute("CREATE TABLE IF NOT EXISTS oturumlar (oturum TEXT PRIMARY KEY, zaman REAL)")
+        self.baglanti.execute(
+            "CREATE TABLE IF NOT EXISTS kayitlar (oturum TEXT, path TEXT, kasa_yolu TEXT, size INTEGER, "
+            "mtime REAL, hash TEXT, sebep TEXT, PRIMARY KEY (oturum, path))")
+        self.baglanti.execute("CREATE INDEX IF NOT EXISTS kayitlar_path ON kayitlar (path)")
+        self.baglanti.executemany("UPDATE oturumlar SET zaman = ? WHERE oturum = ?", [
+            (oturum_zamani(o), o) for (o,) in self.baglanti.execute("SELECT oturum FROM oturumlar WHERE zaman = 0")])
+        self.baglanti.commit()
+
+    @classmethod
+    def ac(cls, yol):
+        try:
+            return cls(yol)
+        except sqlite3.Error as e:
+            GUNLUK.warning(f"KASA INDEKSI ACILAMADI: {yol} -> {e}")
+            return None
+
+    def ekle(self, oturum: str, rel: str, kasa_rel: str, kayit: DosyaKaydi, sebep=None, h=None):
+        self.bekleyen.append((oturum, db_yolu(rel), db_yolu(kasa_rel), kayit.boyut, kayit.mtime, h, sebep))
+        if len(self.bekleyen) >= 1000:
+            self.yaz()
+
+    def yaz(self):
+        if not self.bekleyen: return
+        self.baglanti.executemany("INSERT OR IGNORE INTO oturumlar VALUES (?, ?)",
+                                  [(o, oturum_zamani(o, time.time())) for o in {s[0] for s in self.bekleyen}])
+        self.baglanti.executemany(
+            "INSERT OR REPLACE INTO kayitlar VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self.bekleyen)
+        self.baglanti.commit()
+        self.bekleyen = []
+
+    def hashleri_aktar(self, oturum: str, snapshot_yolu, eksikleri_ekle=False):
+        self.yaz()
+        if not os.path.exists(snapshot_yolu): return 0
+        self.baglanti.execute("ATTACH DATABASE ? AS snap", (str(snapshot_yolu),))
+        try:
+            eklenen = 0
+            if eksikleri_ekle:
+                sutunlar = {satir[1] for satir in self.baglanti.execute("PRAGMA snap.table_info(kayitlar)")}
+                kasa_yolu = "COALESCE(s.kasa_yolu, s.path)" if 'kasa_yolu' in sutunlar else "s.path"
+                eklenen = self.baglanti.execute(
+                    f"INSERT OR IGNORE INTO kayitlar SELECT ?, s.path, {kasa_yolu}, s.size, s.mtime, s.hash, s.sebep "
+                    "FROM snap.kayitlar s", (oturum,)).rowcount
+            self.baglanti.execute(
+                "UPDATE kayitlar SET hash = (SELECT s.hash FROM snap.kayitlar s WHERE s.path = kayitlar.path) "
+                "WHERE oturum = ? AND hash IS NULL", (oturum,))
+            self.baglanti.commit()
+            return eklenen
+        finally:
+            self.baglanti.execute("DETACH DATABASE snap")
+
+    def eski_oturumlari_aktar(self, kok: Path):
+        kayitli = {satir[0] for satir in self.baglanti.execute("SELECT oturum FROM oturumlar")}
+        try:
+            girdiler = [g.name for g in os.scandir(kok) if g.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for ad in girdiler:
+            eslesme = OTURUM_KLASOR_DESENI.match(ad)
+            if not eslesme or eslesme.group(1) in kayitli: continue
+            oturum = eslesme.group(1)
+            snapshot = SnapshotOkuyucu.ac(kok, oturum)
+            try:
+                if snapshot.baglanti is not None:
+                    satirlar = ((oturum, rel, kasa_yolu or rel, boyut, mtime, h, sebep) for rel, h, kasa_yolu, mtime, boyut, sebep
+                                in snapshot.baglanti.execute(
+                                    "SELECT path, hash, " + ("kasa_yolu" if snapshot.kasa_yolu_var() else "NULL") +
+                                    ", mtime, size, sebep FROM kayitlar"))
+                else:
+                    satirlar = ((oturum, db_yolu(rel), db_yolu(rel), None, None, h, None)
+                                for rel, h in snapshot.eski_veri.items())
+                self.baglanti.execute("INSERT OR IGNORE INTO oturumlar VALUES (?, ?)", (oturum, oturum_zamani(oturum)))
+                self.baglanti.executemany("INSERT OR IGNORE INTO kayitlar VALUES (?, ?, ?, ?, ?, ?, ?)", satirlar)
+                self.baglanti.commit()
+                GUNLUK.info(f"KASA INDEKSI | eski oturum aktarildi: {oturum}")
+            finally:
+                snapshot.kapat()
+
+    def oturumlar(self):
+        return self.baglanti.execute(
+            "SELECT o.oturum, o.zaman, COUNT(k.path), COALESCE(SUM(k.size), 0) FROM oturumlar o "
+            "LEFT JOIN kayitlar k ON k.oturum = o.oturum GROUP BY o.oturum ORDER BY o.oturum").fetchall()
+
+    def oturum_ozeti(self, oturum: str):
+        return self.baglanti.execute(
+            "SELECT sebep, COUNT(*), COALESCE(SUM(size), 0) FROM kayitlar WHERE oturum = ? GROUP BY sebep",
+            (oturum,)).fetchall()
+
+    def oturum_var_mi(self, oturum: str):
+        return self.baglanti.execute("SELECT 1 FROM oturumlar WHERE oturum = ?", (oturum,)).fetchone() is not None
+
+    def ara(self, oturum=None, yol_oneki=None, sebep=None, metin=None, desen=None):
+        kosullar, degerler = [], []
+        if oturum:
+            kosullar.append("oturum = ?")
+            degerler.append(oturum)
+        if yol_oneki:
+            kosul, ek = db_onek_kosulu('path', yol_oneki)
+            kosullar.append(kosul)
+            degerler += ek
+        if sebep:
+            kosullar.append("sebep = ?")
+            degerler.append(sebep)
+        if metin:
+            kosullar.append("CAST(path AS TEXT) LIKE ? ESCAPE '\\'")
+            degerler.append('%' + re.sub(r'([%_\\])', r'\\\1', metin) + '%')
+        sorgu = "SELECT oturum, path, size, mtime, hash, sebep, kasa_yolu FROM kayitlar"
+        if kosullar:
+            sorgu += " WHERE " + " AND ".join(kosullar)
+        for o, rel, boyut, mtime, h, dosya_sebebi, kasa_yolu in self.baglanti.execute(
+                sorgu + " ORDER BY oturum, path", degerler):
+            rel = db_yolundan(rel)
+            if desen and not fnmatch.fnmatchcase(rel, desen): continue
+            yield o, rel, boyut, mtime, h, dosya_sebebi, db_yolundan(kasa_yolu)
+
+    def gorunum(self, oturum: str):
+        return OturumGorunumu(self, oturum)
+
+    def geri_yuklenenleri_sil(self, oturum: str, gunluk_yolu):
+        self.baglanti.execute("ATTACH DATABASE ? AS gunluk", (str(gunluk_yolu),))
+        try:
+            self.baglanti.execute(
+                "DELETE FROM kayitlar WHERE oturum = ? AND path IN "
+                "(SELECT path FROM gunluk.tamamlanan WHERE durum = 'TAMAM')", (oturum,))
+            self.baglanti.execute(
+                "DELETE FROM oturumlar WHERE oturum = ? AND NOT EXISTS (SELECT 1 FROM kayitlar WHERE oturum = ?)",
+                (oturum, oturum))
+            self.baglanti.commit()
+        finally:
+            self.baglanti.execute("DETACH DATABASE gunluk")
+
+    def oturumu_sil(self, oturum: str):
+        self.baglanti.execute("DELETE FROM kayitlar WHERE oturum = ?", (oturum,))
+        self.baglanti.execute("DELETE FROM oturumlar WHERE oturum = ?", (oturum,))
+        self.baglanti.commit()
+
+    def kapat(self):
+        try:
+            self.yaz()
+        finally:
+            self.baglanti.close()
+
+class OturumGorunumu:
+    def __init__(self, indeks: KasaIndeksi, oturum: str):
+        self.indeks = indeks
+        self.oturum = oturum
+        self.baglanti = indeks.baglanti
+
+    def hash_getir(self, rel: str):
+        satir = self.baglanti.execute(
+            "SELECT hash FROM kayitlar WHERE oturum = ? AND path = ?", (self.oturum, db_yolu(rel))).fetchone()
+        return satir[0] if satir else None
+
+    def kayitlar(self, yol_oneki=None, sebep=None):
+        for _, rel, _, mtime, h, _, kasa_yolu in self.indeks.ara(self.oturum, yol_oneki, sebep):
+            yield rel, h, kasa_yolu, mtime
+
+    def nesne_referanslari(self):
+        for kasa_yolu, rel in self.baglanti.execute(
+                "SELECT kasa_yolu, path FROM kayitlar WHERE oturum = ? AND kasa_yolu >= ? AND kasa_yolu < ? "
+                "ORDER BY kasa_yolu", (self.oturum, KASA_NESNE_DIZINI + '/', KASA_NESNE_DIZINI + '0')):
+            yield kasa_yolu, db_yolundan(rel)
+
+    def kapat(self):
+        pass
+
+def sinirli_paralel(executor, fonksiyon, ogeler, azami_bekleyen):
+    import concurrent.futures
+    bekleyen = {}
+    for oge in ogeler:
+        if len(bekleyen) >= azami_bekleyen:
+            biten, _ = concurrent.futures.wait(bekleyen, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in biten:
+                yield bekleyen.pop(future), future.result()
+        bekleyen[executor.submit(fonksiyon, oge)] = oge
+    for future in concurrent.futures.as_completed(bekleyen):
+        yield bekleyen[future], future.result()
+
+class HizSinirlayici:
+    def __init__(self, azami_iops=None, azami_bps=None):
+        self.azami_iops = azami_iops
+        self.azami_bps = azami_bps
+        self.islem_jetonu = float(azami_iops or 0)
+        self.bayt_jetonu = float(azami_bps or 0)
+        self.son = time.monotonic()
+        self.kilit = threading.Lock()
+
+    def bekle(self, bayt=0):
+        while True:
+            with self.kilit:
+                simdi = time.monotonic()
+                gecen = simdi - self.son
+                self.son = simdi
+                eksik = 0.0
+                if self.azami_iops:
+                    self.islem_jetonu = min(self.azami_iops, self.islem_jetonu + gecen * self.azami_iops)
+                    if self.islem_jetonu < 1:
+                        eksik = (1 - self.islem_jetonu) / self.azami_iops
+                if self.azami_bps and bayt:
+                    self.bayt_jetonu = min(self.azami_bps, self.bayt_jetonu + gecen * self.azami_bps)
+                    istenen = min(bayt, self.azami_bps)
+                    if self.bayt_jetonu < istenen:
+                        eksik = max(eksik, (istenen - self.bayt_jetonu) / self.azami_bps)
+                if eksik <= 0:
+                    if self.azami_iops: self.islem_jetonu -= 1
+                    if self.azami_bps and bayt: self.bayt_jetonu -= bayt
+                    return
+            time.sleep(eksik)
+
+class GeriYuklemeGunlugu:
+    def __init__(self, yol):
+        self.yol = str(yol)
+        self.bekleyen = []
+        self.baglanti = sqlite3.connect(self.yol)
+        self.baglanti.execute("CREATE TABLE IF NOT EXISTS tamamlanan (path TEXT PRIMARY KEY, durum TEXT)")
+
+    def durum(self, rel: str):
+        satir = self.baglanti.execute("SELECT durum FROM tamamlanan WHERE path=?", (db_yolu(rel),)).fetchone()
+        return satir[0] if satir else None
+
+    def isaretle(self, rel: str, durum: str):
+        self.bekleyen.append((db_yolu(rel), durum))
+        if len(self.bekleyen) >= 500:
+            self.yaz()
+
+    def yaz(self):
+        self.baglanti.executemany("INSERT OR REPLACE INTO tamamlanan VALUES (?, ?)", self.bekleyen)
+        self.baglanti.commit()
+        self.bekleyen = []
+
+    def kapat(self):
+        try:
+            self.yaz()
+        finally:
+            self.baglanti.close()
 
 class KarantinaKasasi:
-    def __init__(self, kok_dizin: Path):
+    def __init__(self, kok_dizin: Path, onbellek=None, icerik_adresli=False, sikistirma=None, oturum=None):
         self.kok = kok_dizin.resolve()
-        self.karantina_dizini = self.kok / KARANTINA_KLASORU
-        
-    def kasaya_tasi(self, dosya_yolu: Path):
+        self.onbellek = onbellek
+        self.icerik_adresli = icerik_adresli
+        self.sikistirma = sikistirma
+        self.oturum = oturum or varsayilan_oturum_id()
+        self.kok_str = str(self.kok)
+        self.karantina_dizini = self.kok / f".karantina_{self.oturum}"
+        self.kasa_str = str(self.karantina_dizini)
+        self.kasa_cihaz = None
+        self.hazir_dizinler = set()
+        self.taze_dizinler = set()
+        self.dogrulanan_nesneler = set()
+        self.dizin_kilidi = threading.Lock()
+
+    def _kasa_hazirla(self):
+        if self.kasa_cihaz is not None: return
         if not self.karantina_dizini.exists():
             self.karantina_dizini.mkdir(parents=True)
-            if platform.system() == "Windows":
+            self.taze_dizinler.add(self.kasa_str)
+            if os.name == 'nt':
                 os.system(f'attrib +h "{self.karantina_dizini}"')
+        self.hazir_dizinler.add(self.kasa_str)
+        self.kasa_cihaz = self.karantina_dizini.stat().st_dev
 
-        gercek_dosya = dosya_yolu.resolve()
+    def _dizin_hazirla(self, dizin: str):
+        if dizin in self.hazir_dizinler: return
+        with self.dizin_kilidi:
+            eksikler = []
+            while dizin not in self.hazir_dizinler:
+                eksikler.append(dizin)
+                dizin = os.path.dirname(dizin)
+            for d in reversed(eksikler):
+                try:
+                    os.mkdir(d)
+                    self.taze_dizinler.add(d)
+                except FileExistsError:
+                    pass
+                self.hazir_dizinler.add(d)
+
+    def _tasi(self, kaynak: str, cihaz=None, boyut=0, sinirlayici=None):
+        import shutil
         try:
-            bagil_yol = gercek_dosya.relative_to(self.kok)
+            bagil_yol = bagil_yol_hesapla(kaynak, self.kok_str, gercek=True)
         except ValueError:
-            logging.error(f"GUVENLIK: Dizin Disina Cikma Girisimi Engellendi: {dosya_yolu}")
-            return False
+            GUNLUK.error(f"GUVENLIK: Dizin Disina Cikma Girisimi Engellendi: {kaynak}")
+            return None
 
-        hedef_yol = self.karantina_dizini / bagil_yol
-        
-        if not hedef_yol.parent.exists():
-            hedef_yol.parent.mkdir(parents=True, exist_ok=True)
-            
-        if hedef_yol.exists():
-            zaman = int(time.time())
-            hedef_yol = hedef_yol.with_name(f"{hedef_yol.stem}_{zaman}{hedef_yol.suffix}")
+        hedef_yol = os.path.join(self.kasa_str, bagil_yol)
+        ust_dizin = os.path.dirname(hedef_yol)
+        try:
+            self._dizin_hazirla(ust_dizin)
+            if ust_dizin not in self.taze_dizinler and os.path.lexists(hedef_yol):
+                govde, uzanti = os.path.splitext(hedef_yol)
+                hedef_yol = f"{govde}_{int(time.time())}{uzanti}"
+
+            if cihaz == self.kasa_cihaz:
+                if sinirlayici: sinirlayici.bekle()
+                try:
+                    os.rename(kaynak, hedef_yol)
+                    OLCUMLER.artir('tasima_yeniden_adlandirma')
+                    return hedef_yol
+                except OSError as e:
+                    if e.errno != errno.EXDEV: raise
+            if sinirlayici: sinirlayici.bekle(boyut)
+            shutil.move(kaynak, hedef_yol)
+            OLCUMLER.artir('tasima_kopyalama')
+            OLCUMLER.artir('tasima_kopyalama_bayt', boyut)
+            return hedef_yol
+        except Exception as e:
+            GUNLUK.error(f"KASA HATASI: {kaynak} -> {e}")
+            OLCUMLER.artir('tasima_hatasi')
+            return None
 
+    def _soguk_mu(self, kayit: DosyaKaydi):
+        return (time.time_ns() - kayit.mtime_ns > KASA_SOGUK_GUN * 86400 * 10**9
+                and kayit.uzanti.lower() not in SIKISTIRILMIS_UZANTILAR)
+
+    @staticmethod
+    def _degismemis_mi(kayit: DosyaKaydi, st):
+        return (st.st_size, st.st_mtime_ns, st.st_ino) == (kayit.boyut, kayit.mtime_ns, kayit.inode)
+
+    def _dogrulayarak_kopyala(self, kayit: DosyaKaydi, beklenen_hash: str, hedef=None, sikistir=False):
+        import lzma
+        sikistirici = None
+        if sikistir:
+            sikistirici = zlib.compressobj(6) if self.sikistirma == 'zlib' else lzma.LZMACompressor(preset=6)
+        sha = hashlib.sha256()
+        gecici = f"{hedef}.{os.getpid()}_{threading.get_ident()}.tmp" if hedef else None
         try:
-            shutil.move(str(gercek_dosya), str(hedef_yol))
+            with open(kayit.yol, 'rb') as g:
+                if not self._degismemis_mi(kayit, os.fstat(g.fileno())): return False
+                with (open(gecici, 'wb') if gecici else contextlib.nullcontext()) as c:
+                    while veri := g.read(1024 * 1024):
+                        sha.update(veri)
+                        if c: c.write(sikistirici.compress(veri) if sikistirici else veri)
+                    if c and sikistirici: c.write(sikistirici.flush())
+            OLCUMLER.artir('kasa_dogrulanan_bayt', kayit.boyut)
+            if sha.hexdigest() != beklenen_hash: return False
+            if gecici:
+                os.replace(gecici, hedef)
+                self.dogrulanan_nesneler.add(hedef)
             return True
-        except Exception as e:
-            logging.error(f"KASA HATASI: {dosya_yolu} -> {e}")
+        finally:
+            if gecici and os.path.exists(gecici): os.remove(gecici)
+
+    def _nesne_parcalari(self, kaynak: str):
+        import lzma
+        uzanti = os.path.splitext(kaynak)[1]
+        acici = zlib.decompressobj() if uzanti == '.zz' else (lzma.LZMADecompressor() if uzanti == '.xz' else None)
+        with open(kaynak, 'rb') as g:
+            while veri := g.read(1024 * 1024):
+                yield acici.decompress(veri) if acici else veri
+        if uzanti == '.zz': yield acici.flush()
+
+    def _nesne_dogru_mu(self, nesne: str, beklenen_hash: str):
+        import lzma
+        if nesne in self.dogrulanan_nesneler: return True
+        sha = hashlib.sha256()
+        try:
+            for veri in self._nesne_parcalari(nesne):
+                sha.update(veri)
+        except (zlib.error, lzma.LZMAError):
             return False
+        if sha.hexdigest() != beklenen_hash: return False
+        self.dogrulanan_nesneler.add(nesne)
+        return True
 
-    def dogrula_ve_geri_yukle(self):
-        print(f"\n[KASA] Geri Yükleme İşlemi Başlatılıyor...")
-        print(f"Konum: {self.karantina_dizini}")
-        
-        snapshot_yolu = self.kok / SNAPSHOT_DOSYASI
-        snapshot_db = {}
-        if snapshot_yolu.exists():
-            try:
-                with open(snapshot_yolu, 'r', encoding='utf-8') as f:
-                    veri = json.load(f)
-                    for oge in veri:
-                        snapshot_db[oge['path']] = oge.get('hash')
-            except: pass
+    def _icerige_tasi(self, kayit: DosyaKaydi, sinirlayici=None, h=None):
+        try:
+            bagil_yol_hesapla(kayit.yol, self.kok_str, gercek=True)
+        except ValueError:
+            GUNLUK.error(f"GUVENLIK: Dizin Disina Cikma Girisimi Engellendi: {kayit.yol}")
+            return None
 
-        if not self.karantina_dizini.exists():
-            print("❌ HATA: Karantina kasası bulunamadı.")
+        try:
+            if not self._degismemis_mi(kayit, os.stat(kayit.yol, follow_symlinks=False)):
+                return self._degisti(kayit)
+            h = h or onbellekli_hash(kayit, self.onbellek)
+            sikistir = self.sikistirma and self._soguk_mu(kayit)
+            uzanti = SIKISTIRMA_UZANTILARI[self.sikistirma] if sikistir else ''
+            hedef_yol = os.path.join(self.kasa_str, KASA_NESNE_DIZINI, h[:2], h + uzanti)
+            self._dizin_hazirla(os.path.dirname(hedef_yol))
+            if sinirlayici: sinirlayici.bekle()
+
+            if os.path.exists(hedef_yol):
+                if not self._nesne_dogru_mu(hedef_yol, h):
+                    GUNLUK.critical(f"KASA NESNESI BOZUK: {hedef_yol} icerigi adiyla uyusmuyor, {kayit.yol} yerinde birakildi")
+                    OLCUMLER.artir('tasima_hatasi')
+                    return None
+                if not self._dogrulayarak_kopyala(kayit, h): return self._degisti(kayit)
+                os.remove(kayit.yol)
+                OLCUMLER.artir('kasa_tekillestirilen')
+                OLCUMLER.artir('kasa_tekillestirilen_bayt', kayit.boyut)
+                return hedef_yol
+            if not sikistir and kayit.cihaz == self.kasa_cihaz:
+                try:
+                    os.replace(kayit.yol, hedef_yol)
+                    OLCUMLER.artir('tasima_yeniden_adlandirma')
+                    return hedef_yol
+                except OSError as e:
+                    if e.errno != errno.EXDEV: raise
+            if sinirlayici: sinirlayici.bekle(kayit.boyut)
+            if not self._dogrulayarak_kopyala(kayit, h, hedef_yol, sikistir): return self._degisti(kayit)
+            os.remove(kayit.yol)
+            if sikistir:
+                OLCUMLER.artir('kasa_sikistirilan')
+            else:
+                OLCUMLER.artir('tasima_kopyalama')
+                OLCUMLER.artir('tasima_kopyalama_bayt', kayit.boyut)
+            return hedef_yol
+        except Exception as e:
+            GUNLUK.error(f"KASA HATASI: {kayit.yol} -> {e}")
+            OLCUMLER.artir('tasima_hatasi')
+            return None
+
+    def _degisti(self, kayit: DosyaKaydi):
+        GUNLUK.error(f"KASA ATLANDI: {kayit.yol} secildikten sonra degisti, yerinde birakildi")
+        OLCUMLER.artir('kasa_degismis_atlandi')
+        return None
+
+    def kasaya_tasi(self, dosya):
+        self._kasa_hazirla()
+        if self.icerik_adresli:
+            kayit = dosya if isinstance(dosya, DosyaKaydi) else DosyaKaydi.yoldan(str(Path(dosya).resolve()))
+            return self._icerige_tasi(kayit) is not None
+        if isinstance(dosya, DosyaKaydi):
+            return self._tasi(dosya.yol, dosya.cihaz, dosya.boyut) is not None
+        return self._tasi(str(Path(dosya).resolve())) is not None
+
+    def toplu_tasi(self, kayitlar, isci_sayisi=TASIMA_ISCISI, sinirlayici=None, hashler=None):
+        import concurrent.futures
+        self._kasa_hazirla()
+        if self.icerik_adresli:
+            tasi = lambda k: self._icerige_tasi(k, sinirlayici, hashler.get(k.yol) if hashler else None)
+        else:
+            tasi = lambda k: self._tasi(k.yol, k.cihaz, k.boyut, sinirlayici)
+        if isci_sayisi <= 1:
+            for k in kayitlar:
+                yield k, tasi(k)
             return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=isci_sayisi) as executor:
+            yield from sinirli_paralel(executor, tasi, kayitlar, isci_sayisi * 4)
 
-        sayac = 0
-        atlanan = 0
-        
-        for root, dirs, files in os.walk(self.karantina_dizini):
+    def _geri_yukleme_adaylari(self, snapshot: SnapshotOkuyucu, yol_oneki=None, desen=None, sebep=None):
+        if snapshot.baglanti is not None:
+            for rel, beklenen_hash, kasa_yolu, mtime in snapshot.kayitlar(yol_oneki, sebep):
+                if desen and not fnmatch.fnmatchcase(rel, desen): continue
+                yield rel, os.path.join(self.kasa_str, *(kasa_yolu or rel).split('/')), beklenen_hash, mtime
+            return
+
+        baslangic = os.path.join(self.kasa_str, *os.path.dirname(yol_oneki or '').split('/'))
+        for root, dirs, files in os.walk(baslangic):
             for file in files:
-                kaynak = Path(root) / file
+                kaynak = os.path.join(root, file)
+                rel = bagil_yol_hesapla(kaynak, self.kasa_str).replace('\\', '/')
+                if rel == GERI_YUKLEME_GUNLUGU: continue
+                if yol_oneki and not rel.startswith(yol_oneki): continue
+                if desen and not fnmatch.fnmatchcase(rel, desen): continue
+                yield rel, kaynak, snapshot.hash_getir(rel), None
+
+    def _nesne_mi(self, kaynak: str):
+        try:
+            return KASA_NESNE_DESENI.fullmatch(bagil_yol_hesapla(kaynak, self.kasa_str).replace('\\', '/'))
+        except ValueError:
+            return None
+
+    def _nesneden_geri_yukle(self, rel: str, kaynak: str, beklenen_hash, mtime):
+        import lzma
+        orijinal_yol = os.path.join(self.kok_str, *rel.split('/'))
+        if os.path.lexists(orijinal_yol):
+            GUNLUK.error(f"GERI YUKLEME CAKISMASI: {orijinal_yol} zaten mevcut, {kaynak} kasada birakildi")
+            return 'CAKISMA'
+        ust_dizin = os.path.dirname(orijinal_yol)
+        if ust_dizin not in self.hazir_dizinler:
+            os.makedirs(ust_dizin, exist_ok=True)
+            self.hazir_dizinler.add(ust_dizin)
+
+        sha = hashlib.sha256()
+        gecici = f"{orijinal_yol}.{os.getpid()}_{threading.get_ident()}.kale_tmp"
+        try:
+            try:
+                with open(gecici, 'wb') as c:
+                    for veri in self._nesne_parcalari(kaynak):
+                        sha.update(veri)
+                        c.write(veri)
+            except (OSError, zlib.error, lzma.LZMAError) as e:
+                GUNLUK.error(f"DOGRULAMA HATASI: {kaynak} okunamadi -> {e}")
+                return 'HATA'
+            OLCUMLER.artir('geri_yukleme_dogrulama')
+            if sha.hexdigest() != beklenen_hash:
+                GUNLUK.critical(f"BUTUNLUK HATASI: {kaynak} hash uyusmuyor! Geri yukleme iptal.")
+                return 'BOZUK'
+            if mtime: os.utime(gecici, (mtime, mtime))
+            os.replace(gecici, orijinal_yol)
+            return 'TAMAM'
+        finally:
+            if os.path.exists(gecici): os.remove(gecici)
+
+    def _nesneyi_sil(self, kasa_yolu: str):
+        try:
+            os.remove(os.path.join(self.kasa_str, *kasa_yolu.split('/')))
+            return 1
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            GUNLUK.error(f"KASA NESNESI SILINEMEDI: {kasa_yolu} -> {e}")
+            return 0
+
+    def _kullanilmayan_nesneleri_sil(self, snapshot: SnapshotOkuyucu, gunluk):
+        silinen = 0
+        onceki = silinecek = None
+        for kasa_yolu, rel in snapshot.nesne_referanslari():
+            if kasa_yolu != onceki:
+                if silinecek: silinen += self._nesneyi_sil(silinecek)
+                onceki = kasa_yolu
+                silinecek = kasa_yolu if KASA_NESNE_DESENI.fullmatch(kasa_yolu) else None
+            if silinecek and gunluk.durum(rel) != 'TAMAM':
+                silinecek = None
+        if silinecek: silinen += self._nesneyi_sil(silinecek)
+        return silinen
+
+    def _geri_yukle(self, oge):
+        import shutil
+        rel, kaynak, beklenen_hash, mtime = oge
+        try:
+            if not os.path.lexists(kaynak):
+                return 'EKSIK'
+            if nesne := self._nesne_mi(kaynak):
+                return self._nesneden_geri_yukle(rel, kaynak, beklenen_hash or nesne.group(1), mtime)
+            if beklenen_hash and beklenen_hash != "HIZ_ICIN_ATLANDI":
                 try:
-                    bagil_yol = kaynak.relative_to(self.karantina_dizini)
-                    orijinal_yol = self.kok / bagil_yol
-                    
-                    str_bagil = str(bagil_yol).replace('\\', '/')
-                    beklenen_hash = snapshot_db.get(str_bagil)
-                    
-                    if beklenen_hash and beklenen_hash != "HIZ_ICIN_ATLANDI":
-                        mevcut_hash = sha256_hesapla(kaynak)
-                        if mevcut_hash != beklenen_hash:
-                            logging.critical(f"BUTUNLUK HATASI: {kaynak} hash uyusmuyor! Geri yukleme iptal.")
-                            print(f"🚨 BOZUK DOSYA: {file} (Hash tutmuyor, geri yüklenmedi)")
-                            atlanan += 1
-                            continue
+                    mevcut_hash = hash_hesapla(kaynak)
+                except OSError as e:
+                    GUNLUK.error(f"DOGRULAMA HATASI: {kaynak} okunamadi -> {e}")
+                    return 'HATA'
+                OLCUMLER.artir('geri_yukleme_dogrulama')
+                if mevcut_hash != beklenen_hash:
+                    GUNLUK.critical(f"BUTUNLUK HATASI: {kaynak} hash uyusmuyor! Geri yukleme iptal.")
+                    return 'BOZUK'
+
+            orijinal_yol = os.path.join(self.kok_str, *rel.split('/'))
+            if os.path.lexists(orijinal_yol):
+                GUNLUK.error(f"GERI YUKLEME CAKISMASI: {orijinal_yol} zaten mevcut, {kaynak} kasada birakildi")
+                return 'CAKISMA'
+            ust_dizin = os.path.dirname(orijinal_yol)
+            if ust_dizin not in self.hazir_dizinler:
+                os.makedirs(ust_dizin, exist_ok=True)
+                self.hazir_dizinler.add(ust_dizin)
+            try:
+                os.rename(kaynak, orijinal_yol)
+            except OSError as e:
+                if e.errno != errno.EXDEV: raise
+                shutil.move(kaynak, orijinal_yol)
+            return 'TAMAM'
+        except Exception as e:
+            GUNLUK.error(f"GERI YUKLEME HATASI: {kaynak} -> {e}")
+            return 'HATA'
 
-                    if not orijinal_yol.parent.exists():
-                        orijinal_yol.parent.mkdir(parents=True)
-                        
-                    shutil.move(str(kaynak), str(orijinal_yol))
-                    sayac += 1
-                except Exception as e:
-                    logging.error(f"GERI YUKLEME HATASI: {kaynak} -> {e}")
+    def _bos_kasayi_kaldir(self):
+        for root, dirs, files in os.walk(self.karantina_dizini, topdown=False):
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+        if self.karantina_dizini.exists():
+            print("⚠️  Kasada snapshot'ta bulunmayan dosyalar kaldı, kasa silinmedi.")
+            return
+        for ad in (f"snapshot_{self.oturum}.db", f"snapshot_{self.oturum}.json"):
+            if (self.kok / ad).exists(): os.remove(self.kok / ad)
+
+    def dogrula_ve_geri_yukle(self, isci_sayisi=TASIMA_ISCISI, yol_oneki=None, desen=None, sebep=None):
+        print("\n[KASA] Geri Yükleme İşlemi Başlatılıyor...")
+        print(f"Konum: {self.karantina_dizini}")
         
-        if atlanan == 0:
+        if not self.karantina_dizini.exists():
+            print("❌ HATA: Karantina kasası bulunamadı.")
+            return Counter()
+
+        kasa_indeksi = KasaIndeksi.ac(self.kok / KASA_INDEKSI_DOSYASI)
+        try:
+            return self._indeksten_geri_yukle(kasa_indeksi, isci_sayisi, yol_oneki, desen, sebep)
+        finally:
+            if kasa_indeksi: kasa_indeksi.kapat()
+
+    def _indeksten_geri_yukle(self, kasa_indeksi, isci_sayisi, yol_oneki, desen, sebep):
+        import concurrent.futures
+        if kasa_indeksi and kasa_indeksi.oturum_var_mi(self.oturum):
+            eklenen = kasa_indeksi.hashleri_aktar(self.oturum, self.kok / f"snapshot_{self.oturum}.db", True)
+            if eklenen:
+                GUNLUK.warning(f"KASA INDEKSI EKSIK: {self.oturum} oturumuna snapshot'tan {eklenen} kayit eklendi")
+            snapshot = kasa_indeksi.gorunum(self.oturum)
+        else:
+            snapshot = SnapshotOkuyucu.ac(self.kok, self.oturum)
+        if sebep and snapshot.baglanti is None:
+            print("❌ HATA: Sebep filtresi için snapshot manifesti (.db) gerekli.")
+            snapshot.kapat()
+            return Counter()
+        yol_oneki = yol_oneki.replace('\\', '/').lstrip('/') if yol_oneki else None
+        gunluk = GeriYuklemeGunlugu(self.karantina_dizini / GERI_YUKLEME_GUNLUGU)
+
+        sayaclar = Counter()
+        def bekleyenler():
+            for oge in self._geri_yukleme_adaylari(snapshot, yol_oneki, desen, sebep):
+                if gunluk.durum(oge[0]) == 'TAMAM':
+                    sayaclar['ONCEDEN'] += 1
+                    continue
+                yield oge
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(isci_sayisi, 1)) as executor:
+                for oge, durum in sinirli_paralel(executor, self._geri_yukle, bekleyenler(), max(isci_sayisi, 1) * 4):
+                    sayaclar[durum] += 1
+                    OLCUMLER.artir(f'geri_yukleme_{durum.lower()}')
+                    if durum == 'BOZUK':
+                        print(f"🚨 BOZUK DOSYA: {oge[0]} (Hash tutmuyor, geri yüklenmedi)")
+                    if durum in ('TAMAM', 'BOZUK'):
+                        gunluk.isaretle(oge[0], durum)
+            gunluk.yaz()
+            sayaclar['NESNE_SILINDI'] = self._kullanilmayan_nesneleri_sil(snapshot, gunluk)
+            if isinstance(snapshot, OturumGorunumu):
+                kasa_indeksi.geri_yuklenenleri_sil(self.oturum, gunluk.yol)
+        finally:
+            gunluk.kapat()
+            snapshot.kapat()
+
+        atlanan = sayaclar['BOZUK'] + sayaclar['CAKISMA'] + sayaclar['HATA']
+        if atlanan == 0 and not (yol_oneki or desen or sebep):
             try:
-                shutil.rmtree(self.karantina_dizini)
-                if snapshot_yolu.exists(): os.remove(snapshot_yolu)
-            except: pass
+                os.remove(gunluk.yol)
+                self._bos_kasayi_kaldir()
+            except OSError as e:
+                GUNLUK.error(f"KASA TEMIZLEME HATASI: {e}")
+            if kasa_indeksi and not self.karantina_dizini.exists():
+                kasa_indeksi.oturumu_sil(self.oturum)
             
-        print(f"✅ İşlem Tamamlandı.")
-        print(f"   Kurtarılan Dosya: {sayac}")
-        print(f"   Reddedilen (Bozuk): {atlanan}")
+        print("✅ İşlem Tamamlandı.")
+        print(f"   Kurtarılan Dosya: {sayaclar['TAMAM']}")
+        print(f"   Reddedilen (Bozuk): {sayaclar['BOZUK']}")
+        if sayaclar['ONCEDEN']:
+            print(f"   Daha Önce Kurtarılan: {sayaclar['ONCEDEN']}")
+        if sayaclar['NESNE_SILINDI']:
+            print(f"   Kasadan Silinen İçerik Nesnesi: {sayaclar['NESNE_SILINDI']}")
+        if sayaclar['CAKISMA'] or sayaclar['HATA']:
+            print(f"   Çakışma / Hata (kasada bırakıldı): {sayaclar['CAKISMA']} / {sayaclar['HATA']}")
+        return sayaclar
+
+def _cihaz_kimligi(girdi: os.DirEntry):
+    if os.name == 'nt':
+        return os.stat(girdi.path, follow_symlinks=False).st_dev
+    return girdi.stat(follow_symlinks=False).st_dev
 
-def kale_tarayici(kok_dizin: Path):
+def _dizin_oku(dizin: str, kok_cihaz_id: int):
+    kayitlar = []
+    alt_dizinler = []
+    try:
+        with os.scandir(dizin) as girdiler:
+            for girdi in girdiler:
+                try:
+                    if girdi.is_dir(follow_symlinks=False):
+                        if girdi.name.startswith('.'):
+                            continue
+                        if _cihaz_kimligi(girdi) == kok_cihaz_id:
+                            alt_dizinler.append(girdi.path)
+                        else:
+                            GUNLUK.warning(f"SINIR ENGELI: Harici disk/mount atlandi {girdi.path}")
+                    elif girdi.is_file(follow_symlinks=False):
+                        if KALE_DOSYA_DESENI.match(girdi.name):
+                            continue
+                        kayitlar.append(DosyaKaydi.girdiden(girdi, kok_cihaz_id))
+                    elif girdi.is_symlink():
+                        GUNLUK.info(f"SEMBOLIK BAG ATLANDI: {girdi.path}")
+                        OLCUMLER.artir('sembolik_bag_atlandi')
+                except OSError: pass
+    except OSError as e:
+        GUNLUK.warning(f"OKUMA HATASI: {dizin} -> {e}")
+        OLCUMLER.artir('dizin_okuma_hatasi')
+    OLCUMLER.artir('dizin_okuma')
+    OLCUMLER.artir('stat', len(kayitlar) + len(alt_dizinler))
+    return kayitlar, alt_dizinler
+
+def _paralel_tarayici(kok_dizin: Path, kok_cihaz_id: int, isci_sayisi: int):
+    cikis = queue.Queue(maxsize=TARAMA_KUYRUK_BOYUTU)
+    kuyruklar = [deque() for _ in range(isci_sayisi)]
+    kuyruklar[0].append(str(kok_dizin))
+    bekleyen = [1]
+    kilit = threading.Lock()
+    dur = threading.Event()
+    BITTI = object()
+
+    def birak(oge):
+        while not dur.is_set():
+            try:
+                cikis.put(oge, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def cal(no):
+        for i in range(1, isci_sayisi):
+            try:
+                return kuyruklar[(no + i) % isci_sayisi].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def isci(no):
+        yerel = kuyruklar[no]
+        try:
+            while not dur.is_set():
+                try:
+                    dizin = yerel.pop()
+                except IndexError:
+                    dizin = cal(no)
+                    if dizin is None:
+                        with kilit:
+                            if bekleyen[0] == 0:
+                                return
+                        time.sleep(0.001)
+                        continue
+
+                kayitlar, alt_dizinler = _dizin_oku(dizin, kok_cihaz_id)
+                with kilit:
+                    bekleyen[0] += len(alt_dizinler) - 1
+                yerel.extend(alt_dizinler)
+                if kayitlar:
+                    birak(kayitlar)
+        finally:
+            birak(BITTI)
+
+    isciler = [threading.Thread(target=isci, args=(i,), daemon=True) for i in range(isci_sayisi)]
+    for t in isciler:
+        t.start()
+
+    biten = 0
+    try:
+        while biten < isci_sayisi:
+            oge = cikis.get()
+            if oge is BITTI:
+                biten += 1
+            else:
+                yield from oge
+    finally:
+        dur.set()
+        for t in isciler:
+            t.join()
+
+def kale_tarayici(kok_dizin: Path, isci_sayisi: int = 1):
     try:
         kok_cihaz_id = kok_dizin.stat().st_dev
     except Exception as e:
         print(f"Kök dizin okunamadı: {e}")
         return
 
-    for root, dirs, files in os.walk(kok_dizin, followlinks=False):
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d != KARANTINA_KLASORU]
-        
-        gecerli_dizinler = []
-        for d in dirs:
+    if isci_sayisi > 1:
+        yield from _paralel_tarayici(kok_dizin, kok_cihaz_id, isci_sayisi)
+        return
+
+    yigin = [str(kok_dizin)]
+    while yigin:
+        kayitlar, alt_dizinler = _dizin_oku(yigin.pop(), kok_cihaz_id)
+        yield from kayitlar
+        yigin.extend(reversed(alt_dizinler))
+
+class DizinIndeksi:
+    def __init__(self, yol):
+        self.yol = str(yol)
+        self.baglanti = sqlite3.connect(self.yol)
+        sutunlar = {satir[1] for satir in self.baglanti.execute("PRAGMA table_info(dizinler)")}
+        if sutunlar and 'kapsam' not in sutunlar:
+            self.baglanti.executescript("DROP TABLE dizinler; DROP TABLE IF EXISTS dosyalar;")
+        self.baglanti.executescript(
+            "CREATE TABLE IF NOT EXISTS dizinler (kapsam TEXT, yol TEXT, mtime_ns INTEGER, alt_dizinler TEXT, "
+            "PRIMARY KEY (kapsam, yol));"
+            "CREATE TABLE IF NOT EXISTS dosyalar (kapsam TEXT, dizin TEXT, isim TEXT, boyut INTEGER, mtime_ns INTEGER, "
+            "inode INTEGER, PRIMARY KEY (kapsam, dizin, isim)) WITHOUT ROWID;")
+
+    def _alt_agaci_sil(self, rel: str, kapsam: str):
+        for tablo, sutun in (('dizinler', 'yol'), ('dosyalar', 'dizin')):
+            kosul, degerler = db_onek_kosulu(sutun, rel + os.sep)
+            self.baglanti.execute(f"DELETE FROM {tablo} WHERE kapsam=? AND ({sutun}=? OR {kosul})",
+                                  [kapsam, db_yolu(rel)] + degerler)
+
+    def kapsamlar(self):
+        return [satir[0] for satir in self.baglanti.execute("SELECT DISTINCT kapsam FROM dizinler")]
+
+    def kaydet(self):
+        self.baglanti.commit()
+
+    def vazgec(self):
+        self.baglanti.rollback()
+
+    def tara(self, kok_dizin: Path, tam=False, kapsam=''):
+        import json
+        kok = str(kok_dizin)
+        try:
+            kok_cihaz_id = os.stat(kok).st_dev
+        except OSError as e:
+            print(f"Kök dizin okunamadı: {e}")
+            return
+        guvenli_an = time.time_ns() - 2 * 10**9
+
+        yigin = ['']
+        while yigin:
+            rel = yigin.pop()
+            dizin = os.path.join(kok, rel) if rel else kok
             try:
-                d_yolu = Path(root) / d
-                if d_yolu.stat().st_dev == kok_cihaz_id:
-                    gecerli_dizinler.append(d)
-                else:
-                    logging.warning(f"SINIR ENGELI: Harici disk/mount atlandi {d_yolu}")
-            except: pass
-        dirs[:] = gecerli_dizinler
+                st = os.stat(dizin, follow_symlinks=False)
+                OLCUMLER.artir('stat')
+            except OSError:
+                self._alt_agaci_sil(rel, kapsam)
+                continue
+            if st.st_dev != kok_cihaz_id:
+                GUNLUK.warning(f"SINIR ENGELI: Harici disk/mount atlandi {dizin}")
+                self._alt_agaci_sil(rel, kapsam)
+                continue
+
+            rel_db = db_yolu(rel)
+            satir = self.baglanti.execute(
+                "SELECT mtime_ns, alt_dizinler FROM dizinler WHERE kapsam=? AND yol=?", (kapsam, rel_db)).fetchone()
+            if not tam and satir and satir[0] == st.st_mtime_ns:
+                OLCUMLER.artir('indeksten_okunan_dizin')
+                alt_isimler = json.loads(satir[1])
+                degisenler, silinenler = [], []
+                satirlar = self.baglanti.execute(
+                    "SELECT isim, boyut, mtime_ns, inode FROM dosyalar WHERE kapsam=? AND dizin=?",
+                    (kapsam, rel_db)).fetchall()
+                OLCUMLER.artir('stat', len(satirlar))
+                for isim_db, boyut, mtime_ns, inode in satirlar:
+                    isim = db_yolundan(isim_db)
+                    yol = os.path.join(dizin, isim)
+                    try:
+                        dst = os.stat(yol, follow_symlinks=False)
+                    except OSError:
+                        silinenler.append((kapsam, rel_db, isim_db))
+                        continue
+                    if not stat.S_ISREG(dst.st_mode):
+                        silinenler.append((kapsam, rel_db, isim_db))
+                        continue
+                    k = DosyaKaydi(yol, isim, dst.st_size, dst.st_mtime_ns, dst.st_ino, kok_cihaz_id)
+                    degisti = (k.boyut, k.mtime_ns, k.inode) != (boyut, mtime_ns, inode)
+                    if degisti: degisenler.append((k.boyut, k.mtime_ns, k.inode, kapsam, rel_db, isim_db))
+                    yield k, degisti
+                self.baglanti.executemany(
+                    "UPDATE dosyalar SET boyut=?, mtime_ns=?, inode=? WHERE kapsam=? AND dizin=? AND isim=?", degisenler)
+                self.baglanti.executemany("DELETE FROM dosyalar WHERE kapsam=? AND dizin=? AND isim=?", silinenler)
+            else:
+                kayitlar, alt_yollar = _dizin_oku(dizin, kok_cihaz_id)
+                eski = {db_yolundan(isim): (boyut, mtime_ns, inode)
+                        for isim, boyut, mtime_ns, inode in self.baglanti.execute(
+                            "SELECT isim, boyut, mtime_ns, inode FROM dosyalar WHERE kapsam=? AND dizin=?",
+                            (kapsam, rel_db))}
+                for k in kayitlar:
+                    yield k, tam or eski.get(k.isim) != (k.boyut, k.mtime_ns, k.inode)
+
+                alt_isimler = [os.path.basename(a) for a in alt_yollar]
+                if satir:
+                    for silinen in set(json.loads(satir[1])) - set(alt_isimler):
+                        self._alt_agaci_sil(os.path.join(rel, silinen), kapsam)
+                self.baglanti.execute("DELETE FROM dosyalar WHERE kapsam=? AND dizin=?", (kapsam, rel_db))
+                self.baglanti.executemany(
+                    "INSERT INTO dosyalar VALUES (?, ?, ?, ?, ?, ?)",
+                    [(kapsam, rel_db, db_yolu(k.isim), k.boyut, k.mtime_ns, k.inode) for k in kayitlar])
+                self.baglanti.execute(
+                    "INSERT OR REPLACE INTO dizinler VALUES (?, ?, ?, ?)",
+                    (kapsam, rel_db, st.st_mtime_ns if st.st_mtime_ns < guvenli_an else -1, json.dumps(alt_isimler)))
+
+            yigin.extend(os.path.join(rel, a) for a in reversed(alt_isimler))
+
+    def dogrula(self, kok_dizin: Path, kapsam=''):
+        kok = str(kok_dizin)
+        sonuc = Counter()
+        for k in kale_tarayici(kok_dizin):
+            rel = os.path.dirname(bagil_yol_hesapla(k.yol, kok))
+            satir = self.baglanti.execute(
+                "SELECT boyut, mtime_ns, inode FROM dosyalar WHERE kapsam=? AND dizin=? AND isim=?",
+                (kapsam, db_yolu(rel), db_yolu(k.isim))).fetchone()
+            if satir is None:
+                sonuc['eksik'] += 1
+            elif tuple(satir) != (k.boyut, k.mtime_ns, k.inode):
+                sonuc['degismis'] += 1
+            else:
+                sonuc['tutarli'] += 1
+        kayitli = self.baglanti.execute("SELECT COUNT(*) FROM dosyalar WHERE kapsam=?", (kapsam,)).fetchone()[0]
+        sonuc['fazla'] = kayitli - sonuc['tutarli'] - sonuc['degismis']
+        return sonuc
+
+    def kapat(self):
+        self.baglanti.close()
 
-        for file in files:
-            yield Path(root) / file
+def _guvenli_hash(kayit: DosyaKaydi, onbellek=None):
+    try:
+        return onbellekli_hash(kayit, onbellek), None
+    except OSError as e:
+        return None, e
 
-def snapshot_olustur(dosya_listesi, kok_klasor: Path, hash_dahil=False):
-    veri = []
+def snapshot_olustur(dosya_listesi, kok_klasor: Path, hash_dahil=False, onbellek=None,
+                     sebep=None, kayit_sebepleri=None, hash_iscisi=HASH_ISCISI, oturum=None, hashler=None):
+    import concurrent.futures
+    kok_str = str(kok_klasor.resolve())
+    yazici = SnapshotYazici(kok_klasor / f"snapshot_{oturum or varsayilan_oturum_id()}.db")
     print("Snapshot (Kurtarma Kaydı) alınıyor...")
+
+    def kayit_ekle(k: DosyaKaydi, h):
+        try:
+            rel = bagil_yol_hesapla(k.yol, kok_str).replace('\\', '/')
+        except ValueError:
+            return
+        yazici.ekle(rel, k, h, kayit_sebepleri[k.yol] if kayit_sebepleri else sebep)
     
-    if hash_dahil:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_path = {executor.submit(sha256_hesapla, p): p for p in dosya_listesi}
-            for future in concurrent.futures.as_completed(future_to_path):
-                p = future_to_path[future]
-                try:
-                    st = p.stat()
-                    rel = str(p.resolve().relative_to(kok_klasor.resolve())).replace('\\', '/')
-                    veri.append({
-                        "path": rel,
-                        "size": st.st_size,
-                        "mtime": st.st_mtime,
-                        "hash": future.result()
-                    })
-                except: pass
-    else:
-        for p in dosya_listesi:
-            try:
-                st = p.stat()
-                rel = str(p.resolve().relative_to(kok_klasor.resolve())).replace('\\', '/')
-                veri.append({
-                    "path": rel,
-                    "size": st.st_size,
-                    "mtime": st.st_mtime,
-                    "hash": "HIZ_ICIN_ATLANDI"
-                })
-            except: pass
-
-    with open(kok_klasor / SNAPSHOT_DOSYASI, 'w', encoding='utf-8') as f:
-        json.dump(veri, f, indent=2)
-
-def temizligi_uygula(dosya_listesi, kok_dizin: Path, simulasyon: bool, sebep: str, hash_gerekli=False):
+    okunamayanlar = []
+    try:
+        if hash_dahil:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=hash_iscisi) as executor:
+                for k, (h, hata) in sinirli_paralel(executor, lambda k: _guvenli_hash(k, onbellek),
+                                                    dosya_listesi, hash_iscisi * 4):
+                    if hata:
+                        GUNLUK.error(f"HASH HATASI: {k.yol} -> {hata}")
+                        okunamayanlar.append(k)
+                    else:
+                        kayit_ekle(k, h)
+                        if hashler is not None: hashler[k.yol] = h
+        else:
+            for k in dosya_listesi:
+                kayit_ekle(k, None)
+    finally:
+        yazici.kapat()
+    return okunamayanlar
+
+def temizligi_uygula(dosya_listesi, kok_dizin: Path, simulasyon: bool, sebep: str, hash_gerekli=False,
+                     kayit_sebepleri=None, onbellek=None, tasima_iscisi=TASIMA_ISCISI, sinirlayici=None,
+                     onayli=False, kasa_ayarlari=None, hash_iscisi=HASH_ISCISI, oturum=None):
     if not dosya_listesi:
         print(">>> Kriterlere uygun dosya bulunamadı.")
-        return
+        return 0
 
-    toplam_boyut = sum(f.stat().st_size for f in dosya_listesi)
-    print(f"\n" + "="*40)
+    toplam_boyut = sum(f.boyut for f in dosya_listesi)
+    print("\n" + "="*40)
     print(f" RAPOR: {sebep}")
-    print(f"="*40)
+    print("="*40)
     print(f" Dosya Sayısı : {len(dosya_listesi)}")
     print(f" Toplam Boyut : {toplam_boyut / 1024 / 1024:.2f} MB")
+    if kayit_sebepleri:
+        for alt_sebep, adet in Counter(kayit_sebepleri[f.yol] for f in dosya_listesi).items():
+            print(f"   - {alt_sebep}: {adet}")
     print("-" * 40)
     
     if simulasyon:
         print("🚨 [SİMÜLASYON] Değişiklik yapılmadı (Dry-Run).")
-        return
+        return 0
 
-    onay = input(">>> Bu dosyalar karantinaya taşınsın mı? (E/H): ")
-    if onay.lower() != 'e':
-        print("İşlem iptal edildi.")
-        return
+    if not onayli:
+        onay = input(">>> Bu dosyalar karantinaya taşınsın mı? (E/H): ")
+        if onay.lower() != 'e':
+            print("İşlem iptal edildi.")
+            return 0
 
-    snapshot_olustur(dosya_listesi, kok_dizin, hash_dahil=hash_gerekli)
-    kasa = KarantinaKasasi(kok_dizin)
+    oturum = oturum or varsayilan_oturum_id()
+    snapshot_yolu = kok_dizin / f"snapshot_{oturum}.db"
+    kasa_ayarlari = kasa_ayarlari or {}
+    hash_gerekli = hash_gerekli or kasa_ayarlari.get('icerik_adresli', False)
+    hashler = {} if kasa_ayarlari.get('icerik_adresli') else None
+    with OLCUMLER.faz('snapshot'):
+        okunamayanlar = snapshot_olustur(dosya_listesi, kok_dizin, hash_dahil=hash_gerekli, onbellek=onbellek,
+                                         sebep=sebep, kayit_sebepleri=kayit_sebepleri, hash_iscisi=hash_iscisi,
+                                         oturum=oturum, hashler=hashler)
+    if okunamayanlar:
+        print(f"⚠️  {len(okunamayanlar)} dosya okunamadı (hash alınamadı), bütünlük garanti edilemediği için taşınmayacak.")
+        atlanacak = {k.yol for k in okunamayanlar}
+        dosya_listesi = [k for k in dosya_listesi if k.yol not in atlanacak]
+    kasa = KarantinaKasasi(kok_dizin, onbellek, oturum=oturum, **kasa_ayarlari)
+    kasa_indeksi = KasaIndeksi.ac(kok_dizin / KASA_INDEKSI_DOSYASI)
     basarili = 0
     
+    farkli_kasa_yollari = []
+    
     print("\nİşlem Başlıyor...")
-    for f in dosya_listesi:
-        if kasa.kasaya_tasi(f):
-            logging.info(f"{sebep} | TASINDI | {f}")
-            basarili += 1
-            sys.stdout.write(f"\rİşlenen: {basarili}/{len(dosya_listesi)}")
-            sys.stdout.flush()
-        time.sleep(IO_GECIKMESI) 
-            
+    try:
+        with OLCUMLER.faz('karantina'):
+            for f, hedef in kasa.toplu_tasi(dosya_listesi, tasima_iscisi, sinirlayici, hashler):
+                if hedef:
+                    rel = bagil_yol_hesapla(f.yol, kasa.kok_str).replace('\\', '/')
+                    kasa_rel = bagil_yol_hesapla(hedef, kasa.kasa_str).replace('\\', '/')
+                    if kasa_rel != rel:
+                        farkli_kasa_yollari.append((kasa_rel, rel))
+                    dosya_sebebi = kayit_sebepleri[f.yol] if kayit_sebepleri else sebep
+                    if kasa_indeksi: kasa_indeksi.ekle(oturum, rel, kasa_rel, f, dosya_sebebi)
+                    GUNLUK.info(f"{dosya_sebebi} | TASINDI | {f.yol}")
+                    basarili += 1
+                    if basarili % 1000 == 0:
+                        sys.stdout.write(f"\rİşlenen: {basarili}/{len(dosya_listesi)}")
+                        sys.stdout.flush()
+        sys.stdout.write(f"\rİşlenen: {basarili}/{len(dosya_listesi)}")
+    finally:
+        try:
+            if farkli_kasa_yollari:
+                yazici = SnapshotYazici(snapshot_yolu)
+                try:
+                    yazici.kasa_yollari_yaz(farkli_kasa_yollari)
+                finally:
+                    yazici.kapat()
+        finally:
+            if kasa_indeksi:
+                try:
+                    kasa_indeksi.hashleri_aktar(oturum, snapshot_yolu)
+                finally:
+                    kasa_indeksi.kapat()
+
     print(f"\n\n✅ Tamamlandı. Başarılı: {basarili}")
-    
-    if os.path.exists(LOG_DOSYASI):
-        h = sha256_hesapla(LOG_DOSYASI)
-        with open(DENETIM_DOSYASI, "w") as f:
-            f.write(f"{datetime.now()}|{h}")
+    denetim_muhru_yaz()
+    return basarili
 
-def modulleri_calistir(kok_dizin: Path, secim: str, ek_arg=None):
-    hedefler = []
-    sebep = "BILINMIYOR"
-    hash_gerekli = False 
+def denetim_muhru_yaz():
+    for gunluk in list(DENETIMLER.values()): gunluk.muhurle()
 
-    print("Tarama yapılıyor, lütfen bekleyin...")
-    generator = kale_tarayici(kok_dizin)
+def gunlugu_dogrula(yol: str):
+    print(f"\nDenetim günlüğü doğrulanıyor: {yol}")
+    muhur = None
+    try:
+        with open(yol + '.sha256', 'r') as f:
+            muhur = f.read().strip().split('|')
+    except OSError:
+        pass
+    try:
+        if muhur and len(muhur) == 2:
+            h = hash_hesapla(yol)
+            if h == muhur[1]:
+                print("✅ Log, eski tip (tam dosya SHA-256) mühürle uyumlu.")
+            else:
+                print("❌ Log, eski tip mühürle uyuşmuyor: dosya değiştirilmiş.")
+            return
+        zincir, satir, hatali = gunluk_zincirini_dogrula(yol)
+    except OSError as e:
+        print(f"❌ HATA: Log okunamadı: {e}")
+        return
+    if hatali:
+        print(f"❌ Zincir {hatali}. satırda kırık: bu satır değiştirilmiş ya da öncesine satır eklenmiş/silinmiş ({satir} satır sağlam).")
+        return
+    if not muhur:
+        print(f"⚠️  Mühür dosyası yok; {satir} satırın zinciri tutarlı, ancak sondan kesilme tespit edilemez.")
+        return
+    if len(muhur) != 3 or muhur[1] != zincir.hex() or muhur[2] != str(satir):
+        print(f"❌ Zincir tutarlı ({satir} satır) fakat mühürle uyuşmuyor: log kesilmiş veya sonuna eklenmiş.")
+        return
+    print(f"✅ {satir} satırın hash zinciri ve mühür doğrulandı ({muhur[0]}).")
 
-    if secim == '1': 
-        sebep = "HASH_ISIMLI_DOSYALAR_(32HEX)"
-        pat = re.compile(r'^[a-fA-F0-9]{32}$')
-        for p in generator:
-            if pat.match(p.stem): hedefler.append(p)
-
-    elif secim == '2': 
-        sebep = "JSON_DOSYALARI"
-        for p in generator:
-            if p.suffix.lower() == '.json': hedefler.append(p)
-
-    elif secim == '3': 
-        sebep = "KELIME_ARAMA"
-        if not ek_arg: return
-        anahtar_kelimeler = [k.strip().lower() for k in ek_arg.split(',') if k.strip()]
-        for p in generator:
-            if any(k in p.name.lower() for k in anahtar_kelimeler): hedefler.append(p)
-
-    elif secim == '4': 
-        sebep = "35KB_ALTI_DOSYALAR"
-        limit = 35 * 1024
-        for p in generator:
-            if p.stat().st_size <= limit: hedefler.append(p)
+def _kuyruga_koy(kuyruk, oge, durdur):
+    while not durdur.is_set():
+        try:
+            kuyruk.put(oge, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
 
-    elif secim == '5': 
-        sebep = "1MB_ALTI_TUM_DOSYALAR"
-        limit = 1024 * 1024
-        for p in generator:
-            if p.stat().st_size <= limit: hedefler.append(p)
+def _kuyruktan_al(kuyruk, durdur, bitti):
+    while not durdur.is_set():
+        try:
+            return kuyruk.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return bitti
 
-    elif secim == '6': 
-        sebep = "KUCUK_VIDEOLAR"
-        limit = 1024 * 1024
-        exts = {'.mp4', '.avi', '.mkv', '.mov', '.flv', '.wmv'}
-        for p in generator:
-            if p.suffix.lower() in exts and p.stat().st_size < limit: hedefler.append(p)
-
-    elif secim == '7': 
-        sebep = "BOS_DOSYALAR_(0_BYTE)"
-        for p in generator:
-            if p.stat().st_size == 0: hedefler.append(p)
-
-    elif secim == '8': 
-        sebep = "SISTEM_COPLERI"
-        exts = {'.tmp', '.log', '.bak', '.old', '.chk', '.dmp'}
-        for p in generator:
-            if p.suffix.lower() in exts: hedefler.append(p)
-
-    elif secim == '9': 
-        sebep = "ISLETIM_SISTEMI_ARTIKLARI"
-        isimler = {'thumbs.db', 'desktop.ini', '.ds_store'}
-        for p in generator:
-            if p.name.lower() in isimler: hedefler.append(p)
-
-    elif secim == '10': 
-        sebep = "ARSIVLER"
-        exts = {'.zip', '.rar', '.7z', '.tar', '.gz'}
-        for p in generator:
-            if p.suffix.lower() in exts: hedefler.append(p)
-
-    elif secim == '11': 
-        sebep = "KURULUM_DOSYALARI"
-        exts = {'.exe', '.msi', '.pkg', '.dmg'}
-        for p in generator:
-            if p.suffix.lower() in exts: hedefler.append(p)
-
-    elif secim == '12': 
-        sebep = "KOPYA_DOSYALAR_(DUPLICATE)"
-        hash_gerekli = True
+def akis_hattini_calistir(kayit_akisi, moduller, kok_dizin: Path, hash_gerekli=False, onbellek=None,
+                          tasima_iscisi=TASIMA_ISCISI, sinirlayici=None, kasa_ayarlari=None, hash_iscisi=HASH_ISCISI,
+                          oturum=None, indeks=None):
+    import concurrent.futures
+    oturum = oturum or varsayilan_oturum_id()
+    snapshot_yolu = kok_dizin / f"snapshot_{oturum}.db"
+    kasa_ayarlari = kasa_ayarlari or {}
+    hash_gerekli = hash_gerekli or kasa_ayarlari.get('icerik_adresli', False)
+    BITTI = object()
+    durdur = threading.Event()
+    hash_kuyrugu = queue.Queue(AKIS_KUYRUK_BOYUTU)
+    tasima_kuyrugu = queue.Queue(max(AKIS_KUYRUK_BOYUTU // AKIS_PARTI_BOYUTU, 2))
+    kok_str = str(kok_dizin)
+    adetler, boyutlar = Counter(), Counter()
+    farkli_kasa_yollari = []
+    hatalar = []
+
+    def hash_asamasi():
+        yazici = SnapshotYazici(snapshot_yolu)
+        try:
+            def gelenler():
+                while (oge := _kuyruktan_al(hash_kuyrugu, durdur, BITTI)) is not BITTI:
+                    yield oge
+            if hash_gerekli:
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=hash_iscisi)
+                sonuclar = sinirli_paralel(executor, lambda oge: _guvenli_hash(oge[0], onbellek),
+                                           gelenler(), hash_iscisi * 4)
+            else:
+                executor = None
+                sonuclar = ((oge, (None, None)) for oge in gelenler())
+            try:
+                parti = []
+                for (kayit, sebep), (h, hata) in sonuclar:
+                    if hata:
+                        GUNLUK.error(f"HASH HATASI: {kayit.yol} -> {hata}")
+                        adetler['OKUNAMADI'] += 1
+                        continue
+                    yazici.ekle(bagil_yol_hesapla(kayit.yol, kok_str).replace('\\', '/'), kayit, h, sebep)
+                    parti.append((kayit, sebep, h))
+                    if len(parti) >= AKIS_PARTI_BOYUTU:
+                        yazici.yaz()
+                        if not _kuyruga_koy(tasima_kuyrugu, parti, durdur): return
+                        parti = []
+                if parti:
+                    yazici.yaz()
+                    _kuyruga_koy(tasima_kuyrugu, parti, durdur)
+            finally:
+                if executor: executor.shutdown(cancel_futures=True)
+        except BaseException as e:
+            hatalar.append(e)
+            durdur.set()
+        finally:
+            yazici.kapat()
+            _kuyruga_koy(tasima_kuyrugu, BITTI, durdur)
+
+    def tasima_asamasi():
+        yazici = None
+        kasa_indeksi = KasaIndeksi.ac(kok_dizin / KASA_INDEKSI_DOSYASI)
+        try:
+            kasa = KarantinaKasasi(kok_dizin, onbellek, oturum=oturum, **kasa_ayarlari)
+            while (parti := _kuyruktan_al(tasima_kuyrugu, durdur, BITTI)) is not BITTI:
+                sebepler = {k.yol: sebep for k, sebep, _ in parti}
+                hashler = {k.yol: h for k, _, h in parti}
+                for k, hedef in kasa.toplu_tasi([k for k, _, _ in parti], tasima_iscisi, sinirlayici, hashler):
+                    if not hedef:
+                        adetler['TASINAMADI'] += 1
+                        continue
+                    rel = bagil_yol_hesapla(k.yol, kasa.kok_str).replace('\\', '/')
+                    kasa_rel = bagil_yol_hesapla(hedef, kasa.kasa_str).replace('\\', '/')
+                    if kasa_rel != rel:
+                        farkli_kasa_yollari.append((kasa_rel, rel))
+                    if kasa_indeksi: kasa_indeksi.ekle(oturum, rel, kasa_rel, k, sebepler[k.yol], hashler[k.yol])
+                    GUNLUK.info(f"{sebepler[k.yol]} | TASINDI | {k.yol}")
+                    adetler[sebepler[k.yol]] += 1
+                    boyutlar[sebepler[k.yol]] += k.boyut
+                if farkli_kasa_yollari:
+                    yazici = yazici or SnapshotYazici(snapshot_yolu)
+                    yazici.kasa_yollari_yaz(farkli_kasa_yollari)
+                    farkli_kasa_yollari.clear()
+                toplam = sum(adetler[m.sebep] for m in moduller)
+                sys.stdout.write(f"\rKarantinaya alınan: {toplam}")
+                sys.stdout.flush()
+        except BaseException as e:
+            hatalar.append(e)
+            durdur.set()
+        finally:
+            if yazici: yazici.kapat()
+            if kasa_indeksi: kasa_indeksi.kapat()
+
+    iplikler = [threading.Thread(target=hash_asamasi, name="kale-akis-hash", daemon=True),
+                threading.Thread(target=tasima_asamasi, name="kale-akis-tasima", daemon=True)]
+    for t in iplikler: t.start()
+
+    print("Akış modu: tarama, snapshot ve karantina eşzamanlı yürütülüyor...")
+    siniflandirici = Siniflandirici(moduller)
+    try:
+        with OLCUMLER.faz('akis_hatti'):
+            for p, degisti in kayit_akisi:
+                siniflandirici.dagit(p, degisti)
+                sahip = None
+                for m in moduller:
+                    if m.hedefler:
+                        if sahip is None: sahip = m
+                        m.hedefler.clear()
+                if sahip and not _kuyruga_koy(hash_kuyrugu, (p, sahip.sebep), durdur): break
+            _kuyruga_koy(hash_kuyrugu, BITTI, durdur)
+            for t in iplikler: t.join()
+    except BaseException:
+        durdur.set()
+        for t in iplikler: t.join()
+        raise
+    finally:
+        if farkli_kasa_yollari:
+            yazici = SnapshotYazici(snapshot_yolu)
+            try:
+                yazici.kasa_yollari_yaz(farkli_kasa_yollari)
+            finally:
+                yazici.kapat()
+    if hatalar: raise hatalar[0]
+
+    toplam = sum(adetler[m.sebep] for m in moduller)
+    print("\n\n" + "="*40)
+    print(" RAPOR: AKIS_HATTI_(" + "+".join(m.no for m in moduller) + ")")
+    print("="*40)
+    print(f" Karantinaya Alınan : {toplam}")
+    print(f" Toplam Boyut       : {sum(boyutlar.values()) / 1024 / 1024:.2f} MB")
+    for m in moduller:
+        if adetler[m.sebep]:
+            print(f"   - {m.sebep}: {adetler[m.sebep]}")
+    if adetler['OKUNAMADI'] or adetler['TASINAMADI']:
+        print(f" Okunamayan / Taşınamayan: {adetler['OKUNAMADI']} / {adetler['TASINAMADI']} (yerinde bırakıldı)")
+    print("-" * 40)
+    if indeks and not (adetler['OKUNAMADI'] or adetler['TASINAMADI']): indeks.kaydet()
+    if toplam: denetim_muhru_yaz()
+    return toplam
+
+class TemizlikModulu:
+    tum_agac = False
+    hash_gerekli = False
+    akisa_uygun = True
+
+    def __init__(self, no: str, sebep: str, kosul=None, uzantilar=None, isimler=None, tum_agac=None):
+        self.no = no
+        self.sebep = sebep
+        if tum_agac is not None: self.tum_agac = tum_agac
+        self.kosul = kosul
+        self.uzantilar = uzantilar
+        self.isimler = isimler
+        self.hedefler = []
+
+    def incele(self, kayit: DosyaKaydi):
+        if self.kosul(kayit): self.hedefler.append(kayit)
+
+    def bitir(self):
+        return self.hedefler
+
+class KopyaTasmaTablosu:
+    def __init__(self, dizin=None, bellek_butcesi_mb=None):
+        import tempfile
+        fd, self.yol = tempfile.mkstemp(prefix='kale_kopya_', suffix='.sqlite', dir=dizin)
+        os.close(fd)
+        self.bekleyen = []
+        self.adet = 0
+        self.baglanti = sqlite3.connect(self.yol)
+        self.baglanti.execute("PRAGMA journal_mode=OFF")
+        self.baglanti.execute("PRAGMA synchronous=OFF")
+        self.baglanti.execute("PRAGMA temp_store=FILE")
+        if bellek_butcesi_mb:
+            self.baglanti.execute(f"PRAGMA cache_size=-{max(int(bellek_butcesi_mb * 1024) // 4, 2048)}")
+        self.baglanti.execute(
+            "CREATE TABLE dosyalar (boyut INTEGER, cihaz INTEGER, inode INTEGER, mtime_ns INTEGER, yol TEXT)")
+
+    @staticmethod
+    def _isaretli(x: int):
+        return x - (1 << 64) if x >= 1 << 63 else x
+
+    @staticmethod
+    def _isaretsiz(x: int):
+        return x + (1 << 64) if x < 0 else x
+
+    def ekle(self, p: DosyaKaydi):
+        self.bekleyen.append((p.boyut, self._isaretli(p.cihaz), self._isaretli(p.inode), p.mtime_ns, db_yolu(p.yol)))
+        if len(self.bekleyen) >= 10000:
+            self.yaz()
+
+    def yaz(self):
+        self.baglanti.executemany("INSERT INTO dosyalar VALUES (?, ?, ?, ?, ?)", self.bekleyen)
+        self.baglanti.commit()
+        self.adet += len(self.bekleyen)
+        self.bekleyen = []
+
+    def tekil_boyut_toplami(self):
+        satir = self.baglanti.execute(
+            "SELECT SUM(boyut) FROM (SELECT boyut FROM dosyalar GROUP BY boyut HAVING COUNT(*) = 1)").fetchone()
+        return satir[0] or 0
+
+    def boyut_gruplari(self):
+        self.yaz()
+        self.baglanti.execute("CREATE INDEX IF NOT EXISTS dosyalar_boyut ON dosyalar (boyut)")
+        imlec = self.baglanti.execute(
+            "SELECT boyut, cihaz, inode, mtime_ns, yol FROM dosyalar WHERE boyut IN "
+            "(SELECT boyut FROM dosyalar GROUP BY boyut HAVING COUNT(*) > 1) ORDER BY boyut, rowid")
+        for boyut, satirlar in itertools.groupby(imlec, key=lambda satir: satir[0]):
+            grup = []
+            for _, cihaz, inode, mtime_ns, yol in satirlar:
+                yol = db_yolundan(yol)
+                grup.append(DosyaKaydi(yol, os.path.basename(yol), boyut, mtime_ns,
+                                       self._isaretsiz(inode), self._isaretsiz(cihaz)))
+            yield boyut, grup
+
+    def kapat(self):
+        self.baglanti.close()
+        try:
+            os.remove(self.yol)
+        except OSError as e:
+            GUNLUK.warning(f"GECICI DOSYA SILINEMEDI: {self.yol} -> {e}")
+
+class KopyaModulu(TemizlikModulu):
+    tum_agac = True
+    hash_gerekli = True
+    akisa_uygun = False
+
+    def __init__(self, onbellek=None, algoritma=None, bellek_butcesi_mb=None, tasma_dizini=None, hash_iscisi=None):
+        super().__init__('12', "KOPYA_DOSYALAR_(DUPLICATE)")
+        self.onbellek = onbellek
+        self.hash_iscisi = hash_iscisi
+        self.algoritma = algoritma or KOPYA_HASH_ALGORITMASI
+        self.bellek_butcesi_mb = bellek_butcesi_mb or KOPYA_BELLEK_BUTCESI_MB
+        self.tasma_dizini = tasma_dizini or KOPYA_TASMA_DIZINI
+        self.kayit_siniri = (int(self.bellek_butcesi_mb * 1024 * 1024) // KOPYA_KAYIT_BELLEK_TAHMINI
+                             if self.bellek_butcesi_mb else None)
+        self.kayit_sayisi = 0
+        self.tasma = None
+        self.boyut_haritasi = {}
+        self.sayaclar = Counter()
+
+    def incele(self, p: DosyaKaydi):
+        if p.boyut <= 0: return
+        if self.tasma:
+            self.tasma.ekle(p)
+            return
+        self.boyut_haritasi.setdefault(p.boyut, []).append(p)
+        self.kayit_sayisi += 1
+        if self.kayit_siniri and self.kayit_sayisi > self.kayit_siniri:
+            self._diske_tas()
+
+    def _diske_tas(self):
+        print(f"\n  Kopya analizi bellek bütçesini ({self.bellek_butcesi_mb:g} MB) aştı, kayıtlar diske taşınıyor...")
+        self.tasma = KopyaTasmaTablosu(self.tasma_dizini, self.bellek_butcesi_mb)
+        GUNLUK.info(f"KOPYA ANALIZI | disk tasmasi: {self.tasma.yol}")
+        for grup in self.boyut_haritasi.values():
+            for p in grup:
+                self.tasma.ekle(p)
+        self.boyut_haritasi = {}
+
+    def _paralel_grupla(self, fonksiyon, ogeler):
+        import concurrent.futures
+        gruplar = {}
+
+        def guvenli(oge):
+            try:
+                return fonksiyon(oge), None
+            except OSError as e:
+                return None, e
+
+        isci_sayisi = self.hash_iscisi or HASH_ISCISI
+        with concurrent.futures.ThreadPoolExecutor(max_workers=isci_sayisi) as executor:
+            for oge, (h, hata) in sinirli_paralel(executor, guvenli, ogeler, isci_sayisi * 4):
+                if hata:
+                    GUNLUK.error(f"KOPYA ANALIZI OKUMA HATASI: {oge[0].yol} -> {hata}")
+                    self.sayaclar['okuma_hatasi'] += 1
+                    continue
+                gruplar.setdefault((oge[0].boyut, h), []).append(oge)
+        return [g for g in gruplar.values() if len(g) > 1]
+
+    def _boyut_gruplari(self):
+        if self.tasma:
+            self.sayaclar['boyut_eleme_bayt'] += self.tasma.tekil_boyut_toplami()
+            yield from self.tasma.boyut_gruplari()
+            return
+        boyut_haritasi, self.boyut_haritasi = self.boyut_haritasi, {}
+        while boyut_haritasi:
+            yield boyut_haritasi.popitem()
+
+    def kopyalari_uret(self):
+        sayac = self.sayaclar
+        parti, parti_kayit = [], 0
+        try:
+            for boyut, grup in self._boyut_gruplari():
+                if len(grup) < 2:
+                    sayac['boyut_eleme_bayt'] += boyut
+                    continue
+                inodelar = {}
+                for p in grup:
+                    inodelar.setdefault((p.cihaz, p.inode), []).append(p)
+                sayac['hardlink_bayt'] += (len(grup) - len(inodelar)) * boyut
+                if len(inodelar) < 2:
+                    sayac['boyut_eleme_bayt'] += boyut
+                    continue
+                parti.extend(inodelar.values())
+                parti_kayit += len(grup)
+                if self.kayit_siniri and parti_kayit >= self.kayit_siniri:
+                    yield from self._partiyi_isle(parti)
+                    parti, parti_kayit = [], 0
+            if parti:
+                yield from self._partiyi_isle(parti)
+        finally:
+            if self.tasma:
+                self.tasma.kapat()
+
+    def _partiyi_isle(self, inode_gruplari):
+        sayac = self.sayaclar
+        ornek_siniri = 2 * ORNEK_BOYUTU
+        ornek_gruplari = self._paralel_grupla(lambda g: onbellekli_ornek_hash(g[0], self.onbellek),
+                                               inode_gruplari)
+        for g in inode_gruplari:
+            sayac['ornek_okunan_bayt'] += min(g[0].boyut, ornek_siniri)
+        hayatta = {id(g) for grup in ornek_gruplari for g in grup}
+        for g in inode_gruplari:
+            if id(g) not in hayatta:
+                sayac['ornek_eleme_bayt'] += max(g[0].boyut - ornek_siniri, 0)
+
+        kopya_gruplari = [grup for grup in ornek_gruplari if grup[0][0].boyut <= ornek_siniri]
+        tam_hashlenecek = [g for grup in ornek_gruplari if grup[0][0].boyut > ornek_siniri for g in grup]
+        for g in tam_hashlenecek:
+            sayac['tam_hash_okunan_bayt'] += g[0].boyut
+        kopya_gruplari.extend(self._paralel_grupla(lambda g: onbellekli_hash(g[0], self.onbellek, self.algoritma),
+                                                   tam_hashlenecek))
+
+        for grup in kopya_gruplari:
+            grup.sort(key=lambda g: (g[0].mtime_ns, g[0].yol))
+            for g in grup[1:]:
+                yield from g
+
+    def bitir(self):
         print("Duplicate (Kopya) analizi başlatılıyor (Bu işlem yavaş olabilir)...")
-        boyut_haritasi = {}
-        for p in generator:
-            s = p.stat().st_size
-            if s > 0: boyut_haritasi.setdefault(s, []).append(p)
-        
-        adaylar = [g for g in boyut_haritasi.values() if len(g) > 1]
-        hashlenecekler = [f for g in adaylar for f in g]
-        
-        hash_haritasi = {}
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_path = {executor.submit(sha256_hesapla, p): p for p in hashlenecekler}
-            for future in concurrent.futures.as_completed(future_to_path):
-                p = future_to_path[future]
-                h = future.result()
-                if h: hash_haritasi.setdefault(h, []).append(p)
-
-        for grup in hash_haritasi.values():
-            if len(grup) > 1:
-                grup.sort(key=lambda x: x.stat().st_mtime)
-                hedefler.extend(grup[1:]) 
-        
-    elif secim == '13': 
-        sebep = "ESKI_DOSYALAR_(6_AY+)"
-        limit = 180 * 86400
-        simdi = time.time()
-        for p in generator:
-            if (simdi - p.stat().st_mtime) > limit: hedefler.append(p)
+        sayac = self.sayaclar
+        tasinan = self.tasma.adet + len(self.tasma.bekleyen) if self.tasma else 0
+        self.hedefler.extend(self.kopyalari_uret())
+
+        mb = lambda x: x / 1024 / 1024
+        print(f"  Boyut eleme      : {mb(sayac['boyut_eleme_bayt']):.2f} MB okunmadı")
+        print(f"  Hardlink birleşim: {mb(sayac['hardlink_bayt']):.2f} MB okunmadı")
+        print(f"  Örnek (baş/son)  : {mb(sayac['ornek_okunan_bayt']):.2f} MB okundu, "
+              f"{mb(sayac['ornek_eleme_bayt']):.2f} MB okunmadı")
+        print(f"  Tam hash         : {mb(sayac['tam_hash_okunan_bayt']):.2f} MB okundu ({self.algoritma})")
+        if sayac['okuma_hatasi']:
+            print(f"  Okunamayan       : {sayac['okuma_hatasi']} dosya/grup değerlendirme dışı bırakıldı")
+        if tasinan:
+            print(f"  Disk taşması     : {tasinan} kayıt geçici tabloda gruplandı")
+            OLCUMLER.artir('kopya_diske_tasinan', tasinan)
+        GUNLUK.info(f"KOPYA ANALIZI | {dict(sayac)}")
+        return self.hedefler
+
+class KotaKovasi:
+    __slots__ = ('yollar', 'boyutlar', 'mtimeler', 'inodelar', 'cihazlar', 'toplam')
+
+    def __init__(self):
+        self.yollar = []
+        self.boyutlar = array.array('q')
+        self.mtimeler = array.array('q')
+        self.inodelar = array.array('Q')
+        self.cihazlar = array.array('Q')
+        self.toplam = 0
+
+    def ekle(self, p: DosyaKaydi):
+        self.yollar.append(p.yol)
+        self.boyutlar.append(p.boyut)
+        self.mtimeler.append(p.mtime_ns)
+        self.inodelar.append(p.inode)
+        self.cihazlar.append(p.cihaz)
+        self.toplam += p.boyut
 
-    elif secim == '14': 
-        sebep = "OFFICE_KILIT_DOSYALARI"
-        for p in generator:
-            if p.name.startswith("~$"): hedefler.append(p)
+    def kayit(self, i: int):
+        yol = self.yollar[i]
+        return DosyaKaydi(yol, os.path.basename(yol), self.boyutlar[i], self.mtimeler[i],
+                          self.inodelar[i], self.cihazlar[i])
 
-    elif secim == '15': 
-        sebep = "YAZILIMCI_ARTIKLARI"
-        exts = {'.pyc', '.class', '.o', '.obj'}
-        for p in generator:
-            if p.suffix.lower() in exts: hedefler.append(p)
+class KotaModulu(TemizlikModulu):
+    tum_agac = True
+    akisa_uygun = False
 
-    elif secim == '16': 
-        sebep = "KOTA_YONETICISI"
+    def __init__(self, hedef_mb: int, risk_motoru=None):
+        super().__init__('16', "KOTA_YONETICISI")
+        self.hedef_byte = hedef_mb * 1024 * 1024
+        self.risk_motoru = risk_motoru or RiskMotoru()
+        self.mevcut_toplam = 0
+        self.kovalar = {}
+        self.tampon = []
+
+    def incele(self, p: DosyaKaydi):
+        self.tampon.append(p)
+        if len(self.tampon) >= TOPLU_DEGERLENDIRME_BOYUTU:
+            self._tamponu_isle()
+
+    def _tamponu_isle(self):
+        for p, (skor, _) in zip(self.tampon, self.risk_motoru.toplu_degerlendir(self.tampon)):
+            self.mevcut_toplam += p.boyut
+            if skor >= 80: continue
+            kova = self.kovalar.get(skor)
+            if kova is None:
+                kova = self.kovalar[skor] = KotaKovasi()
+            kova.ekle(p)
+        self.tampon = []
+
+    def bitir(self):
+        self._tamponu_isle()
+        if self.mevcut_toplam <= self.hedef_byte:
+            print("Klasör zaten hedef kotanın altında.")
+            return None
+
+        gereken = self.mevcut_toplam - self.hedef_byte
+        print(f"Temizlenmesi gereken alan: {gereken/1024/1024:.2f} MB")
+        biriken = 0
+        for skor in sorted(self.kovalar):
+            kova = self.kovalar[skor]
+            if biriken + kova.toplam < gereken:
+                self.hedefler.extend(kova.kayit(i) for i in range(len(kova.yollar)))
+                biriken += kova.toplam
+                continue
+            yigin = [(-boyut, i) for i, boyut in enumerate(kova.boyutlar)]
+            heapq.heapify(yigin)
+            while biriken < gereken:
+                eksi_boyut, i = heapq.heappop(yigin)
+                self.hedefler.append(kova.kayit(i))
+                biriken -= eksi_boyut
+            break
+        self.kovalar = {}
+        return self.hedefler
+
+def modul_olustur(secim: str, ek_arg=None, onbellek=None, risk_motoru=None, hash_iscisi=None):
+    if secim == '1':
+        pat = re.compile(r'^[a-fA-F0-9]{32}$')
+        return TemizlikModulu(secim, "HASH_ISIMLI_DOSYALAR_(32HEX)", kosul=lambda p: pat.match(p.govde))
+    if secim == '2':
+        return TemizlikModulu(secim, "JSON_DOSYALARI", uzantilar={'.json'})
+    if secim == '3':
+        if not ek_arg: return None
+        if ek_arg.startswith('@'):
+            try:
+                anahtar_kelimeler = kelime_dosyasi_oku(ek_arg[1:])
+            except OSError as e:
+                print(f"Hata: Kelime dosyası okunamadı: {e}")
+                return None
+        else:
+            anahtar_kelimeler = [k.strip().lower() for k in ek_arg.split(',') if k.strip()]
+        if not anahtar_kelimeler: return None
+        kelime_deseni = re.compile(trie_deseni(sorted(set(anahtar_kelimeler))))
+        return TemizlikModulu(secim, "KELIME_ARAMA", kosul=lambda p: kelime_deseni.search(p.isim.lower()))
+    if secim == '4':
+        limit = 35 * 1024
+        return TemizlikModulu(secim, "35KB_ALTI_DOSYALAR", kosul=lambda p: p.boyut <= limit)
+    if secim == '5':
+        limit = 1024 * 1024
+        return TemizlikModulu(secim, "1MB_ALTI_TUM_DOSYALAR", kosul=lambda p: p.boyut <= limit)
+    if secim == '6':
+        limit = 1024 * 1024
+        exts = {'.mp4', '.avi', '.mkv', '.mov', '.flv', '.wmv'}
+        return TemizlikModulu(secim, "KUCUK_VIDEOLAR",
+                              kosul=lambda p: p.uzanti.lower() in exts and p.boyut < limit)
+    if secim == '7':
+        return TemizlikModulu(secim, "BOS_DOSYALAR_(0_BYTE)", kosul=lambda p: p.boyut == 0)
+    if secim == '8':
+        return TemizlikModulu(secim, "SISTEM_COPLERI", uzantilar={'.tmp', '.log', '.bak', '.old', '.chk', '.dmp'})
+    if secim == '9':
+        return TemizlikModulu(secim, "ISLETIM_SISTEMI_ARTIKLARI", isimler={'thumbs.db', 'desktop.ini', '.ds_store'})
+    if secim == '10':
+        return TemizlikModulu(secim, "ARSIVLER", uzantilar={'.zip', '.rar', '.7z', '.tar', '.gz'})
+    if secim == '11':
+        return TemizlikModulu(secim, "KURULUM_DOSYALARI", uzantilar={'.exe', '.msi', '.pkg', '.dmg'})
+    if secim == '12':
+        return KopyaModulu(onbellek, hash_iscisi=hash_iscisi)
+    if secim == '13':
+        limit_ns = 180 * 86400 * 10**9
+        simdi_ns = time.time_ns()
+        return TemizlikModulu(secim, "ESKI_DOSYALAR_(6_AY+)", kosul=lambda p: (simdi_ns - p.mtime_ns) > limit_ns,
+                              tum_agac=True)
+    if secim == '14':
+        return TemizlikModulu(secim, "OFFICE_KILIT_DOSYALARI", kosul=lambda p: p.isim.startswith("~$"))
+    if secim == '15':
+        return TemizlikModulu(secim, "YAZILIMCI_ARTIKLARI", uzantilar={'.pyc', '.class', '.o', '.obj'})
+    if secim == '16':
         try:
             hedef_mb = int(ek_arg)
         except: 
             print("Hata: Geçersiz MB değeri.")
+            return None
+        return KotaModulu(hedef_mb, risk_motoru)
+    print(f"Hata: Geçersiz modül numarası: {secim}")
+    return None
+
+class Siniflandirici:
+    def __init__(self, moduller):
+        self.moduller = moduller
+        self.uzanti_haritasi = {}
+        self.isim_haritasi = {}
+        self.kosullu = []
+        self.tum_agac_modulleri = [m for m in moduller if m.tum_agac]
+        for m in moduller:
+            if m.uzantilar:
+                for u in m.uzantilar: self.uzanti_haritasi.setdefault(u, []).append(m)
+            elif m.isimler:
+                for i in m.isimler: self.isim_haritasi.setdefault(i, []).append(m)
+            else:
+                self.kosullu.append(m)
+
+    def dagit(self, kayit: DosyaKaydi, degisti=True):
+        if not degisti:
+            for m in self.tum_agac_modulleri:
+                m.incele(kayit)
             return
-        
-        tum_dosyalar = []
-        for p in generator:
-            skor, _ = RiskMotoru.degerlendir(p)
-            tum_dosyalar.append({
-                "path": p,
-                "size": p.stat().st_size,
-                "score": skor
-            })
-        
-        mevcut_toplam = sum(x['size'] for x in tum_dosyalar)
-        hedef_byte = hedef_mb * 1024 * 1024
-        
-        if mevcut_toplam > hedef_byte:
-            gereken = mevcut_toplam - hedef_byte
-            print(f"Temizlenmesi gereken alan: {gereken/1024/1024:.2f} MB")
-            tum_dosyalar.sort(key=lambda x: (x['score'], -x['size']))
-            biriken = 0
-            for f in tum_dosyalar:
-                if f['score'] >= 80: continue
-                hedefler.append(f['path'])
-                biriken += f['size']
-                if biriken >= gereken: break
+        if self.uzanti_haritasi or self.isim_haritasi:
+            isim = kayit.isim.lower()
+            for m in self.uzanti_haritasi.get(os.path.splitext(isim)[1], ()):
+                m.hedefler.append(kayit)
+            for m in self.isim_haritasi.get(isim, ()):
+                m.hedefler.append(kayit)
+        for m in self.kosullu:
+            m.incele(kayit)
+
+def modulleri_hazirla(secim: str, ek_arg=None, onbellek=None, risk_motoru=None, hash_iscisi=None):
+    secimler = [s.strip() for s in secim.split(',') if s.strip()]
+    moduller = []
+    for s in dict.fromkeys(secimler):
+        m = modul_olustur(s, ek_arg.get(s) if isinstance(ek_arg, dict) else ek_arg, onbellek, risk_motoru, hash_iscisi)
+        if m is None: return None
+        moduller.append(m)
+    return moduller or None
+
+def indeks_kapsami(moduller, ek_arg=None):
+    parcalar = []
+    for m in moduller:
+        arg = ek_arg.get(m.no) if isinstance(ek_arg, dict) else ek_arg
+        parcalar.append(f"{m.no}={arg}" if arg and m.no in ('3', '16') else m.no)
+    return ",".join(sorted(parcalar))
+
+def sonuclari_topla(moduller):
+    sonuclar = []
+    alinan = set()
+    for m in moduller:
+        with OLCUMLER.faz(f'modul_{m.no}'):
+            hedefler = m.bitir()
+        if hedefler is None: continue
+        yeni = [p for p in hedefler if p.yol not in alinan]
+        alinan.update(p.yol for p in yeni)
+        sonuclar.append((m, yeni))
+    return sonuclar
+
+def sonuclari_uygula(moduller, kok_dizin: Path, birlesik=False, hash_zorunlu=False, sonuclar=None, **uygulama):
+    if sonuclar is None: sonuclar = sonuclari_topla(moduller)
+    if len(sonuclar) > 1 and birlesik:
+        hedefler = [p for _, liste in sonuclar for p in liste]
+        sebepler = {p.yol: m.sebep for m, liste in sonuclar for p in liste}
+        sebep = "BIRLESIK_RAPOR_(" + "+".join(m.no for m, _ in sonuclar) + ")"
+        hash_gerekli = hash_zorunlu or any(m.hash_gerekli for m, _ in sonuclar)
+        return temizligi_uygula(hedefler, kok_dizin, False, sebep, hash_gerekli, kayit_sebepleri=sebepler, **uygulama)
+    return sum(temizligi_uygula(hedefler, kok_dizin, False, m.sebep, hash_zorunlu or m.hash_gerekli, **uygulama)
+               for m, hedefler in sonuclar)
+
+def _kayit_akisi(kok_dizin: Path, tarama_iscisi=1, indeks=None, tam_tarama=False, kapsam=''):
+    if indeks:
+        degisen = 0
+        for p, degisti in indeks.tara(kok_dizin, tam_tarama, kapsam):
+            degisen += degisti
+            yield p, degisti
+        OLCUMLER.artir('taranan_dosya', degisen)
+        print(f"Artımlı tarama: {degisen} yeni/değişen dosya değerlendirildi.")
+    else:
+        taranan = 0
+        for p in kale_tarayici(kok_dizin, tarama_iscisi):
+            taranan += 1
+            yield p, True
+        OLCUMLER.artir('taranan_dosya', taranan)
+
+def modulleri_calistir(kok_dizin: Path, secim: str, ek_arg=None, tarama_iscisi=1, birlesik=False, onbellek=None,
+                       tasima_iscisi=TASIMA_ISCISI, sinirlayici=None, risk_motoru=None, indeks=None,
+                       tam_tarama=False, akis=False, onayli=False, hash_zorunlu=False, kasa_ayarlari=None,
+                       hash_iscisi=HASH_ISCISI, oturum=None):
+    moduller = modulleri_hazirla(secim, ek_arg, onbellek, risk_motoru, hash_iscisi)
+    if not moduller: return 0
+    kayit_akisi = _kayit_akisi(kok_dizin, tarama_iscisi, indeks, tam_tarama, indeks_kapsami(moduller, ek_arg))
+
+    if akis and not all(m.akisa_uygun for m in moduller):
+        print("⚠️  12 ve 16 tüm ağacı gerektirdiği için akış modu kullanılamıyor, toplu modda devam ediliyor.")
+        akis = False
+    if akis:
+        if not onayli:
+            onay = input(">>> Akış modunda eşleşen dosyalar tarama sırasında doğrudan karantinaya alınır "
+                         "(rapor sonda verilir). Devam edilsin mi? (E/H): ")
+            if onay.lower() != 'e':
+                print("İşlem iptal edildi.")
+                return 0
+        hash_gerekli = hash_zorunlu or any(m.hash_gerekli for m in moduller)
+        try:
+            return akis_hattini_calistir(kayit_akisi, moduller, kok_dizin, hash_gerekli, onbellek, tasima_iscisi,
+                                         sinirlayici, kasa_ayarlari, hash_iscisi, oturum, indeks)
+        finally:
+            if indeks: indeks.vazgec()
+
+    siniflandirici = Siniflandirici(moduller)
+    print("Tarama yapılıyor, lütfen bekleyin...")
+    try:
+        with OLCUMLER.faz('tarama'):
+            for p, degisti in kayit_akisi:
+                siniflandirici.dagit(p, degisti)
+
+        sonuclar = sonuclari_topla(moduller)
+        basarili = sonuclari_uygula(moduller, kok_dizin, birlesik, onbellek=onbellek, tasima_iscisi=tasima_iscisi,
+                                    sinirlayici=sinirlayici, onayli=onayli, hash_zorunlu=hash_zorunlu,
+                                    kasa_ayarlari=kasa_ayarlari, hash_iscisi=hash_iscisi, oturum=oturum,
+                                    sonuclar=sonuclar)
+        if indeks and basarili == sum(len(hedefler) for _, hedefler in sonuclar): indeks.kaydet()
+        return basarili
+    finally:
+        if indeks: indeks.vazgec()
+
+class InotifyIzleyici:
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    IN_ISDIR = 0x40000000
+    MASKE = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self.ctypes = ctypes
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            hata = ctypes.get_errno()
+            raise OSError(hata, os.strerror(hata))
+        self.izlenen = {}
+
+    def ekle(self, dizin: str, ebeveyn=None, isim=None):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dizin), self.MASKE)
+        if wd < 0:
+            hata = self.ctypes.get_errno()
+            raise OSError(hata, os.strerror(hata), dizin)
+        self.izlenen[wd] = (ebeveyn, dizin if ebeveyn is None else isim)
+        return wd
+
+    def kaldir(self, wd: int):
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def yol(self, wd: int):
+        parcalar = []
+        while wd is not None:
+            oge = self.izlenen.get(wd)
+            if oge is None: return None
+            wd, isim = oge
+            parcalar.append(isim)
+        return os.path.join(*reversed(parcalar))
+
+    def olaylar(self, zaman_asimi: float):
+        import select
+        hazir, _, _ = select.select([self.fd], [], [], max(zaman_asimi, 0))
+        if not hazir: return
+        try:
+            veri = os.read(self.fd, 1 << 20)
+        except BlockingIOError:
+            return
+        konum = 0
+        while konum < len(veri):
+            wd, maske, _, uzunluk = struct.unpack_from('iIII', veri, konum)
+            isim = os.fsdecode(veri[konum + 16:konum + 16 + uzunluk].rstrip(b'\0'))
+            konum += 16 + uzunluk
+            yield wd, maske, isim
+
+    def kapat(self):
+        os.close(self.fd)
+
+def izleme_modu(kok_dizin: Path, secim: str, ek_arg=None, aralik=IZLEME_ARALIGI, birlesik=False, onbellek=None,
+                risk_motoru=None, **uygulama):
+    moduller = modulleri_hazirla(secim, ek_arg, onbellek, risk_motoru)
+    if not moduller: return
+    if any(m.tum_agac for m in moduller):
+        print("Hata: İzleme modunda yalnızca dosya bazlı modüller kullanılabilir (12, 13 ve 16 hariç).")
+        return
+
+    kok = str(kok_dizin)
+    kok_cihaz_id = kok_dizin.stat().st_dev
+    kapsam = indeks_kapsami(moduller, ek_arg)
+    izleyici = None
+    if sys.platform.startswith('linux'):
+        try:
+            izleyici = InotifyIzleyici()
+        except (OSError, AttributeError) as e:
+            GUNLUK.warning(f"INOTIFY KULLANILAMIYOR: {e}")
+    indeks = None
+    oturum, oturum_baslangici, oturum_yollari = None, 0.0, set()
+
+    def izle_ve_tara(dizin, ebeveyn=None):
+        nonlocal izleyici
+        yigin = [(dizin, ebeveyn)]
+        while yigin:
+            dizin, ebeveyn = yigin.pop()
+            wd = None
+            if izleyici:
+                try:
+                    wd = izleyici.ekle(dizin, ebeveyn, os.path.basename(dizin))
+                except OSError as e:
+                    GUNLUK.warning(f"INOTIFY IZLEME EKLENEMEDI: {dizin} -> {e}; yoklama moduna geciliyor")
+                    print(f"⚠️  inotify izleme sınırına ulaşıldı ({e.strerror}); yoklama moduna geçiliyor.")
+                    izleyici.kapat()
+                    izleyici = None
+            kayitlar, alt_dizinler = _dizin_oku(dizin, kok_cihaz_id)
+            yield from kayitlar
+            yigin.extend((a, wd) for a in reversed(alt_dizinler))
+
+    def uygula(kayitlar):
+        nonlocal oturum, oturum_baslangici, oturum_yollari
+        yeni_moduller = modulleri_hazirla(secim, ek_arg, onbellek, risk_motoru)
+        siniflandirici = Siniflandirici(yeni_moduller)
+        bos = True
+        for p in kayitlar:
+            siniflandirici.dagit(p)
+            bos = False
+        if bos: return True
+        sonuclar = sonuclari_topla(yeni_moduller)
+        hedef_sayisi = sum(len(hedefler) for _, hedefler in sonuclar)
+        yollar = {p.yol for _, hedefler in sonuclar for p in hedefler}
+        if (oturum is None or time.monotonic() - oturum_baslangici > IZLEME_OTURUM_SURESI
+                or not oturum_yollari.isdisjoint(yollar)):
+            oturum, oturum_baslangici, oturum_yollari = yeni_oturum_id(kok_dizin), time.monotonic(), set()
+        oturum_yollari |= yollar
+        if hedef_sayisi: GUNLUK.info(f"IZLEME PARTISI | {oturum} | {hedef_sayisi} dosya")
+        basarili = sonuclari_uygula(yeni_moduller, kok_dizin, birlesik, onbellek=onbellek, onayli=True,
+                                    sonuclar=sonuclar, oturum=oturum, **uygulama)
+        return basarili == hedef_sayisi
+
+    def indeksle_uygula(yalniz_degisen):
+        try:
+            if uygula(p for p, degisti in indeks.tara(kok_dizin, kapsam=kapsam) if degisti or not yalniz_degisen):
+                indeks.kaydet()
+        finally:
+            indeks.vazgec()
+
+    def kayit_al(yol):
+        try:
+            st = os.lstat(yol)
+        except OSError:
+            return None
+        isim = os.path.basename(yol)
+        if not stat.S_ISREG(st.st_mode) or st.st_dev != kok_cihaz_id or KALE_DOSYA_DESENI.match(isim):
+            return None
+        return DosyaKaydi(yol, isim, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+
+    print(f"👁️  İzleme modu: {kok} ({'inotify' if izleyici else 'yoklama'}, {aralik:g} sn aralıkla)")
+    GUNLUK.info(f"IZLEME BASLADI | {kok} | moduller={secim}")
+    try:
+        print("İlk tarama yapılıyor...")
+        if izleyici:
+            uygula(izle_ve_tara(kok))
         else:
-            print("Klasör zaten hedef kotanın altında.")
+            indeks = DizinIndeksi(kok_dizin / DIZIN_INDEKSI_DOSYASI)
+            indeksle_uygula(False)
+        tam_tarama_gerekli = False
+        bekleyen = set()
+
+        while True:
+            bitis = time.monotonic() + aralik
+            while izleyici and (kalan := bitis - time.monotonic()) > 0:
+                for wd, maske, isim in izleyici.olaylar(kalan):
+                    if maske & izleyici.IN_Q_OVERFLOW:
+                        tam_tarama_gerekli = True
+                        continue
+                    if maske & izleyici.IN_IGNORED:
+                        izleyici.izlenen.pop(wd, None)
+                        continue
+                    ust = izleyici.yol(wd)
+                    if ust is None: continue
+                    if maske & izleyici.IN_MOVE_SELF:
+                        if not os.path.isdir(ust): izleyici.kaldir(wd)
+                        continue
+                    if not isim: continue
+                    yol = os.path.join(ust, isim)
+                    if maske & izleyici.IN_ISDIR:
+                        if isim.startswith('.'): continue
+                        try:
+                            if os.lstat(yol).st_dev != kok_cihaz_id: continue
+                        except OSError:
+                            continue
+                        for k in izle_ve_tara(yol, wd):
+                            bekleyen.add(k.yol)
+                            if len(bekleyen) > IZLEME_BEKLEYEN_SINIRI: break
+                    else:
+                        bekleyen.add(yol)
+                    if len(bekleyen) > IZLEME_BEKLEYEN_SINIRI:
+                        tam_tarama_gerekli = True
+                        bekleyen.clear()
+                    if not izleyici: break
+            if not izleyici:
+                time.sleep(max(bitis - time.monotonic(), 0))
+
+            if izleyici and tam_tarama_gerekli:
+                GUNLUK.warning("IZLEME TASMASI: olay kuyrugu tasti, tam tarama yapiliyor")
+                bekleyen.clear()
+                tam_tarama_gerekli = False
+                uygula(izle_ve_tara(kok))
+            elif izleyici:
+                kayitlar = [k for k in map(kayit_al, bekleyen) if k]
+                bekleyen.clear()
+                if kayitlar: uygula(kayitlar)
+            elif indeks is None:
+                indeks = DizinIndeksi(kok_dizin / DIZIN_INDEKSI_DOSYASI)
+                indeksle_uygula(False)
+            else:
+                indeksle_uygula(True)
+    finally:
+        if izleyici: izleyici.kapat()
+        if indeks: indeks.kapat()
+        GUNLUK.info(f"IZLEME DURDU | {kok}")
+
+def son_karantina_oturumu(kok_dizin: Path):
+    try:
+        adaylar = [e.group(1) for g in os.scandir(kok_dizin)
+                   if (e := OTURUM_KLASOR_DESENI.match(g.name)) and g.is_dir(follow_symlinks=False)]
+    except OSError:
+        return None
+    return max(adaylar, default=None)
+
+def kasa_indeksini_ac(kok_dizin: Path):
+    kasa_indeksi = KasaIndeksi.ac(kok_dizin / KASA_INDEKSI_DOSYASI)
+    if kasa_indeksi is None:
+        print("❌ HATA: Kasa indeksi açılamadı.")
+        return None
+    kasa_indeksi.eski_oturumlari_aktar(kok_dizin)
+    return kasa_indeksi
+
+def kasa_listele(kok_dizin: Path, oturum=None, metin=None, yol_oneki=None, desen=None, sebep=None):
+    kasa_indeksi = kasa_indeksini_ac(kok_dizin)
+    if kasa_indeksi is None: return
+    try:
+        if not (oturum or metin or yol_oneki or desen or sebep):
+            oturumlar = kasa_indeksi.oturumlar()
+            if not oturumlar:
+                print("Kasada kayıtlı oturum yok.")
+                return
+            print(f"\n{'OTURUM':<17} {'TARİH':<19} {'DOSYA':>8} {'BOYUT (MB)':>11}")
+            for o, zaman, adet, boyut in oturumlar:
+                tarih = f"{datetime.fromtimestamp(zaman):%Y-%m-%d %H:%M:%S}" if zaman is not None else "?"
+                print(f"{o:<17} {tarih:<19} {adet:>8} {boyut / 1024 / 1024:>11.2f}")
             return
+        yol_oneki = yol_oneki.replace('\\', '/').lstrip('/') if yol_oneki else None
+        adet = toplam = 0
+        for o, rel, boyut, _, _, dosya_sebebi, _ in kasa_indeksi.ara(oturum, yol_oneki, sebep, metin, desen):
+            boyut_metni = f"{boyut / 1024:.1f} KB" if boyut is not None else "?"
+            print(f"{o} | {rel} | {boyut_metni} | {dosya_sebebi or '-'}")
+            adet += 1
+            toplam += boyut or 0
+        print(f"\nToplam: {adet} dosya, {toplam / 1024 / 1024:.2f} MB")
+    finally:
+        kasa_indeksi.kapat()
+
+def kasa_imha(kok_dizin: Path, gun, onayli=False, haric=None):
+    import shutil
+    if gun is None:
+        print("Hata: purge için --older-than GÜN belirtilmelidir.")
+        return
+    kasa_indeksi = kasa_indeksini_ac(kok_dizin)
+    if kasa_indeksi is None: return
+    try:
+        sinir = time.time() - gun * 86400
+        oturumlar = [o for o in kasa_indeksi.oturumlar() if o[0] != haric]
+        eskiler = [o for o in oturumlar if o[1] is not None and o[1] < sinir]
+        bilinmeyen = sum(1 for o in oturumlar if o[1] is None)
+        if bilinmeyen:
+            print(f"⚠️  Oluşturulma zamanı belirlenemeyen {bilinmeyen} oturum atlandı.")
+        if not eskiler:
+            print(f"{gun:g} günden eski karantina oturumu yok.")
+            return
+        print(f"\n{gun:g} günden eski {len(eskiler)} oturum kalıcı olarak silinecek:")
+        for o, _, adet, boyut in eskiler:
+            print(f"   {o}: {adet} dosya, {boyut / 1024 / 1024:.2f} MB")
+        if not onayli and input(">>> Bu oturumların kasası kalıcı olarak silinsin mi? (E/H): ").lower() != 'e':
+            print("İşlem iptal edildi.")
+            return
+        silinen = 0
+        for o, _, adet, boyut in eskiler:
+            try:
+                kasa_dizini = kok_dizin / f".karantina_{o}"
+                if kasa_dizini.exists(): shutil.rmtree(kasa_dizini)
+                for ad in (f"snapshot_{o}.db", f"snapshot_{o}.json"):
+                    if (kok_dizin / ad).exists(): os.remove(kok_dizin / ad)
+            except OSError as e:
+                GUNLUK.error(f"KASA IMHA HATASI: {o} -> {e}")
+                print(f"⚠️  {o} silinemedi: {e}")
+                continue
+            kasa_indeksi.oturumu_sil(o)
+            GUNLUK.warning(f"KASA IMHA | {o} | {adet} dosya | {boyut} bayt")
+            silinen += 1
+        print(f"✅ Silinen oturum: {silinen}/{len(eskiler)}")
+    finally:
+        kasa_indeksi.kapat()
+
+class KaleOturumu:
+    def __init__(self, kok_dizin, oturum_id=None, hash_onbellegi=True, hash_onbellek_boyutu=HASH_ONBELLEK_LIMITI,
+                 risk_motoru=None, sinirlayici=None, artimli=False, kasa_ayarlari=None, denetim=True,
+                 gunluk_dizini=None, tarama_iscisi=1, tasima_iscisi=TASIMA_ISCISI, hash_iscisi=HASH_ISCISI):
+        self.kok = Path(kok_dizin).resolve()
+        uygun, sebep = guvenli_yol_mu(self.kok)
+        if not uygun:
+            raise PermissionError(sebep)
+        self.id = oturum_id or yeni_oturum_id(self.kok)
+        self.risk_motoru = risk_motoru
+        self.sinirlayici = sinirlayici
+        self.kasa_ayarlari = kasa_ayarlari or {}
+        self.tarama_iscisi = tarama_iscisi
+        self.tasima_iscisi = tasima_iscisi
+        self.hash_iscisi = hash_iscisi
+        self._onbellek_sahibi = not isinstance(hash_onbellegi, HashOnbellegi)
+        if not self._onbellek_sahibi:
+            self.onbellek = hash_onbellegi
+        elif hash_onbellegi:
+            yol = self.kok / HASH_ONBELLEK_DOSYASI if hash_onbellegi is True else hash_onbellegi
+            self.onbellek = HashOnbellegi.ac(yol, hash_onbellek_boyutu)
+        else:
+            self.onbellek = None
+        self.indeks = DizinIndeksi(self.kok / DIZIN_INDEKSI_DOSYASI) if artimli else None
+        self.denetim = denetim_baslat(self.id, gunluk_dizini) if denetim else None
 
-    temizligi_uygula(hedefler, kok_dizin, False, sebep, hash_gerekli)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.kapat()
+
+    def kapat(self):
+        if self.onbellek and self._onbellek_sahibi: self.onbellek.kapat()
+        if self.indeks: self.indeks.kapat()
+        self.onbellek = self.indeks = None
+        if self.denetim is not None: denetim_durdur(self.denetim)
+        self.denetim = None
+
+    def tara(self, tam_tarama=False):
+        try:
+            for p, _ in _kayit_akisi(self.kok, self.tarama_iscisi, self.indeks, tam_tarama):
+                yield p
+            if self.indeks: self.indeks.kaydet()
+        finally:
+            if self.indeks: self.indeks.vazgec()
+
+    def sec(self, secim: str, ek_arg=None, tam_tarama=False):
+        moduller = modulleri_hazirla(secim, ek_arg, self.onbellek, self.risk_motoru, self.hash_iscisi)
+        if not moduller:
+            raise ValueError(f"Geçersiz modül seçimi: {secim}")
+        siniflandirici = Siniflandirici(moduller)
+        try:
+            with OLCUMLER.faz('tarama'):
+                for p, degisti in _kayit_akisi(self.kok, self.tarama_iscisi, self.indeks, tam_tarama,
+                                               indeks_kapsami(moduller, ek_arg)):
+                    siniflandirici.dagit(p, degisti)
+        finally:
+            if self.indeks: self.indeks.vazgec()
+        return sonuclari_topla(moduller)
+
+    def karantinaya_al(self, dosya_listesi, sebep: str, kayit_sebepleri=None, hash_gerekli=False):
+        return temizligi_uygula(list(dosya_listesi), self.kok, False, sebep, hash_gerekli, kayit_sebepleri,
+                                self.onbellek, self.tasima_iscisi, self.sinirlayici, True, self.kasa_ayarlari,
+                                self.hash_iscisi, self.id)
+
+    def calistir(self, secim: str, ek_arg=None, birlesik=False, akis=False, tam_tarama=False, hash_zorunlu=False,
+                 onayli=True):
+        return modulleri_calistir(self.kok, secim, ek_arg, self.tarama_iscisi, birlesik, self.onbellek,
+                                  self.tasima_iscisi, self.sinirlayici, self.risk_motoru, self.indeks, tam_tarama,
+                                  akis, onayli, hash_zorunlu, self.kasa_ayarlari, self.hash_iscisi, self.id)
+
+    def izle(self, secim: str, ek_arg=None, aralik=IZLEME_ARALIGI, birlesik=False):
+        izleme_modu(self.kok, secim, ek_arg, aralik, birlesik, self.onbellek, self.risk_motoru,
+                    tasima_iscisi=self.tasima_iscisi, sinirlayici=self.sinirlayici, kasa_ayarlari=self.kasa_ayarlari)
+
+    def geri_yukle(self, oturum=None, yol_oneki=None, desen=None, sebep=None):
+        kasa = KarantinaKasasi(self.kok, self.onbellek, oturum=oturum or son_karantina_oturumu(self.kok) or self.id)
+        with OLCUMLER.faz('geri_yukleme'):
+            return kasa.dogrula_ve_geri_yukle(self.tasima_iscisi, yol_oneki, desen, sebep)
+
+    def oturumlar(self):
+        kasa_indeksi = kasa_indeksini_ac(self.kok)
+        if kasa_indeksi is None: return []
+        try:
+            return kasa_indeksi.oturumlar()
+        finally:
+            kasa_indeksi.kapat()
+
+    def ara(self, oturum=None, metin=None, yol_oneki=None, desen=None, sebep=None):
+        kasa_indeksi = kasa_indeksini_ac(self.kok)
+        if kasa_indeksi is None: return []
+        try:
+            yol_oneki = yol_oneki.replace('\\', '/').lstrip('/') if yol_oneki else None
+            return list(kasa_indeksi.ara(oturum, yol_oneki, sebep, metin, desen))
+        finally:
+            kasa_indeksi.kapat()
+
+    def imha(self, gun, onayli=True):
+        kasa_imha(self.kok, gun, onayli, haric=self.id)
+
+    def indeksi_dogrula(self, secim=None, ek_arg=None):
+        indeks = self.indeks or DizinIndeksi(self.kok / DIZIN_INDEKSI_DOSYASI)
+        try:
+            if secim:
+                moduller = modulleri_hazirla(secim, ek_arg)
+                if not moduller:
+                    raise ValueError(f"Geçersiz modül seçimi: {secim}")
+                kapsam = indeks_kapsami(moduller, ek_arg)
+            else:
+                kapsamlar = indeks.kapsamlar()
+                if len(kapsamlar) > 1:
+                    raise ValueError(f"İndekste birden fazla modül seçimi var ({' | '.join(k or '-' for k in kapsamlar)}); "
+                                     "doğrulanacak seçim belirtilmeli.")
+                kapsam = kapsamlar[0] if kapsamlar else ''
+            return indeks.dogrula(self.kok, kapsam)
+        finally:
+            if indeks is not self.indeks: indeks.kapat()
+
+def fiziksel_cihaz(yol: Path):
+    st_dev = os.stat(yol).st_dev
+    if sys.platform.startswith('linux'):
+        blok = f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}"
+        if os.path.exists(blok):
+            gercek = os.path.realpath(blok)
+            if os.path.exists(os.path.join(gercek, 'partition')):
+                gercek = os.path.dirname(gercek)
+            return os.path.basename(gercek)
+        return f"{os.major(st_dev)}:{os.minor(st_dev)}"
+    return str(st_dev)
+
+class IplikCiktisi:
+    def __init__(self, asil):
+        self.asil = asil
+        self.yerel = threading.local()
+
+    def yakala(self):
+        self.yerel.tampon = []
+
+    def birak(self):
+        tampon, self.yerel.tampon = self.yerel.tampon, None
+        return ''.join(tampon)
+
+    def write(self, metin):
+        tampon = getattr(self.yerel, 'tampon', None)
+        if tampon is None:
+            return self.asil.write(metin)
+        tampon.append(metin)
+        return len(metin)
+
+    def flush(self):
+        if getattr(self.yerel, 'tampon', None) is None:
+            self.asil.flush()
+
+    def __getattr__(self, ad):
+        return getattr(self.asil, ad)
+
+def kokleri_topla(args):
+    yollar = list(args.path or [])
+    if args.roots_file:
+        try:
+            with open(args.roots_file, 'r', encoding='utf-8') as f:
+                yollar += [satir.strip() for satir in f if satir.strip() and not satir.lstrip().startswith('#')]
+        except OSError as e:
+            print(f"Hata: Kök listesi okunamadı: {e}")
+            return None
+    kokler = list(dict.fromkeys(Path(y).resolve() for y in yollar))
+    for kok in kokler:
+        for diger in kokler:
+            if kok != diger and diger in kok.parents:
+                print(f"Hata: İç içe kökler birlikte işlenemez: {diger} ⊃ {kok}")
+                return None
+    return kokler
+
+def coklu_kok_calistir(args, kokler, risk_motoru=None, oturum=None):
+    import concurrent.futures
+    if not args.module or args.module in KASA_KOMUTLARI or args.watch or args.verify_index:
+        print("Hata: Çoklu kök modu yalnızca --module ile temizlik modüllerini destekler.")
+        return
+    if not args.yes:
+        print("Hata: Çoklu kök modunda kökler paralel işlendiği için --yes gereklidir.")
+        return
+    oturum = oturum or varsayilan_oturum_id()
+    seritler = {}
+    for kok in kokler:
+        uygun, sebep = guvenli_yol_mu(kok)
+        if not uygun:
+            print(f"🛑 GÜVENLİK ENGELİ: {kok} -> {sebep}")
+            continue
+        try:
+            seritler.setdefault(fiziksel_cihaz(kok), []).append(kok)
+        except OSError as e:
+            print(f"❌ {kok} erişilemiyor: {e}")
+    if not seritler: return
+
+    butce = max(args.device_workers, 1)
+    print(f"\n🔒 {sum(map(len, seritler.values()))} kök, {len(seritler)} fiziksel cihaz "
+          f"(cihaz başına {butce} işçi):")
+    for cihaz, liste in seritler.items():
+        print(f"   {cihaz}: " + ", ".join(map(str, liste)))
+
+    kasa_ayarlari = {'icerik_adresli': args.cas_vault or bool(args.vault_compress), 'sikistirma': args.vault_compress}
+    ortak_onbellek = HashOnbellegi.ac(args.hash_cache, args.hash_cache_size) \
+        if args.hash_cache and args.hash_cache != 'none' else None
+    cikti = IplikCiktisi(sys.stdout)
+    cikti_kilidi = threading.Lock()
+    sonuclar = {}
+
+    def kok_isle(kok: Path, sinirlayici):
+        with KaleOturumu(kok, oturum, ortak_onbellek if args.hash_cache else True, args.hash_cache_size, risk_motoru,
+                         sinirlayici, args.incremental or args.full_rescan, kasa_ayarlari, denetim=False,
+                         tarama_iscisi=butce, tasima_iscisi=butce, hash_iscisi=butce) as kok_oturumu:
+            kok_oturumu.calistir(args.module, args.arg, args.merge_report, args.pipeline, args.full_rescan,
+                                 args.snapshot_hash)
+
+    def serit_calistir(cihaz, liste):
+        sinirlayici = None
+        if args.max_iops or args.max_bytes_per_sec:
+            sinirlayici = HizSinirlayici(args.max_iops, args.max_bytes_per_sec)
+        for kok in liste:
+            baslangic = time.monotonic()
+            cikti.yakala()
+            hata = None
+            try:
+                kok_isle(kok, sinirlayici)
+            except Exception as e:
+                hata = e
+                GUNLUK.error(f"COKLU KOK HATASI: {kok} -> {e}")
+            finally:
+                metin = cikti.birak()
+            sonuclar[kok] = (cihaz, time.monotonic() - baslangic, hata)
+            with cikti_kilidi:
+                cikti.asil.write(f"\n{'#' * 60}\n# {kok} [{cihaz}]\n{'#' * 60}\n{metin}\n")
+                cikti.asil.flush()
+
+    sys.stdout = cikti
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(seritler)) as executor:
+            for f in [executor.submit(serit_calistir, cihaz, liste) for cihaz, liste in seritler.items()]:
+                f.result()
+    finally:
+        sys.stdout = cikti.asil
+        if ortak_onbellek: ortak_onbellek.kapat()
+    toplu_rapor_yazdir(sonuclar, oturum)
+
+def toplu_rapor_yazdir(sonuclar, oturum: str):
+    toplam_sebep = Counter()
+    toplam_boyut = Counter()
+    print("\n" + "=" * 60)
+    print(" TOPLU RAPOR: ÇOKLU KÖK")
+    print("=" * 60)
+    for kok, (cihaz, sure, hata) in sorted(sonuclar.items()):
+        adet = boyut = 0
+        kasa_indeksi = KasaIndeksi.ac(kok / KASA_INDEKSI_DOSYASI) if not hata else None
+        if kasa_indeksi:
+            try:
+                for sebep, n, b in kasa_indeksi.oturum_ozeti(oturum):
+                    adet += n
+                    boyut += b
+                    toplam_sebep[sebep] += n
+                    toplam_boyut[sebep] += b
+            finally:
+                kasa_indeksi.kapat()
+        durum = f"HATA: {hata}" if hata else f"{adet} dosya, {boyut / 1024 / 1024:.2f} MB"
+        print(f" {kok} [{cihaz}] {sure:.1f} sn -> {durum}")
+    print("-" * 60)
+    for sebep, n in toplam_sebep.most_common():
+        print(f"   - {sebep}: {n} dosya, {toplam_boyut[sebep] / 1024 / 1024:.2f} MB")
+    print(f" Toplam Karantina : {sum(toplam_sebep.values())} dosya, "
+          f"{sum(toplam_boyut.values()) / 1024 / 1024:.2f} MB")
+    print("=" * 60)
 
 def guvenli_klasor_sec():
     if sunucu_modu_mu():
@@ -494,21 +3087,91 @@ def ana_menu_goster():
     
     print("\n--- GELİŞMİŞ YÖNETİM ---")
     print("16. Akıllı Kota Yöneticisi (Hedef Boyuta İndir)")
-    print(" R. GERİ YÜKLE (ROLLBACK - Karantinadan Döndür)")
+    print(" R. GERİ YÜKLE (ROLLBACK - Son Karantina Oturumundan Döndür)")
+    print(" L. KASA OTURUMLARINI LİSTELE")
+    print("    (Birden fazla modül için virgülle ayırın, örn: 7,8,9,15)")
     print(" Q. ÇIKIŞ")
     print("-" * 60)
 
 def main():
+    global KOPYA_HASH_ALGORITMASI, KOPYA_BELLEK_BUTCESI_MB, KOPYA_TASMA_DIZINI
+    import argparse
     parser = argparse.ArgumentParser(description="Ultra Cleaner V8 - Kale Sürümü (Türkçe)")
-    parser.add_argument('--path', type=str, help="Hedef Dizin")
-    parser.add_argument('--module', type=str, help="Modül Numarası (1-16) veya 'restore'")
-    parser.add_argument('--arg', type=str, help="Ek argüman (Kelime listesi veya Kota MB)")
+    parser.add_argument('--path', type=str, action='append', help="Hedef Dizin (birden fazla kök için tekrarlanabilir)")
+    parser.add_argument('--roots-file', type=str, help="Satır başına bir kök dizin içeren dosya (# ile yorum)")
+    parser.add_argument('--device-workers', type=int, default=TASIMA_ISCISI,
+                        help="Çoklu kök: her fiziksel cihaz için tarama/hash/taşıma işçi bütçesi")
+    parser.add_argument('--module', type=str, help="Modül Numarası (1-16), virgülle birden fazla (örn. 7,8,9) veya 'restore', 'list', 'search', 'purge'")
+    parser.add_argument('--arg', type=str, help="Ek argüman (Kelime listesi, @kelime_dosyasi veya Kota MB)")
+    parser.add_argument('--rules', type=str, help="Risk motoru kural dosyası (kelime/uzanti/desen satırları)")
+    parser.add_argument('--merge-report', action='store_true', help="Birden fazla modülde tek birleşik rapor üret")
+    parser.add_argument('--scan-workers', type=int, default=1, help="Paralel dizin okuyucu sayısı (1 = seri tarama)")
+    parser.add_argument('--hash-cache', type=str, help="Hash önbelleği dosyası (varsayılan: hedef dizin, 'none' = kapalı)")
+    parser.add_argument('--move-workers', type=int, default=TASIMA_ISCISI, help="Paralel karantina taşıyıcı sayısı")
+    parser.add_argument('--max-iops', type=float, help="Saniyedeki en fazla taşıma işlemi (token bucket)")
+    parser.add_argument('--max-bytes-per-sec', type=float, help="Cihazlar arası kopyalamada saniyedeki en fazla bayt")
+    parser.add_argument('--path-prefix', type=str, help="Geri yükleme: yalnızca bu göreli yol önekiyle başlayanlar")
+    parser.add_argument('--glob', type=str, help="Geri yükleme: göreli yola uygulanacak desen (örn. 'belgeler/*.pdf')")
+    parser.add_argument('--reason', type=str, help="Geri yükleme: yalnızca bu modül sebebiyle taşınanlar")
+    parser.add_argument('--session', type=str, help="Kasa oturumu (örn. 20240131_142500; varsayılan: en son oturum)")
+    parser.add_argument('--older-than', type=float, help="purge: bu kadar günden eski kasa oturumlarını kalıcı sil")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Kalıcı dizin indeksiyle artımlı tarama (mtime'ı değişmeyen dizinler yeniden okunmaz)")
+    parser.add_argument('--full-rescan', action='store_true', help="Artımlı indeksi yok say, tüm ağacı yeniden tara ve değerlendir")
+    parser.add_argument('--verify-index', action='store_true', help="Dizin indeksini diskle karşılaştır ve raporla")
+    parser.add_argument('--watch', action='store_true', help="Sürekli izleme modu (Linux: inotify, diğer: yoklama)")
+    parser.add_argument('--watch-interval', type=float, default=IZLEME_ARALIGI, help="İzleme modunda toplu karantina aralığı (sn)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Tarama, snapshot ve karantinayı sınırlı kuyruklarla eşzamanlı yürüt (12 ve 16 hariç)")
+    parser.add_argument('--yes', action='store_true', help="Onay sorusunu atla (otomasyon için)")
+    parser.add_argument('--snapshot-hash', action='store_true',
+                        help="Tüm taşınan dosyaların SHA-256'sını snapshot'a yaz (geri yüklemede doğrulanır)")
+    parser.add_argument('--cas-vault', action='store_true',
+                        help="İçerik adresli kasa: aynı içerik bir kez saklanır (kopyalar yalnızca manifestte tutulur)")
+    parser.add_argument('--vault-compress', choices=sorted(SIKISTIRMA_UZANTILARI),
+                        help=f"İçerik adresli kasada {KASA_SOGUK_GUN} günden eski dosyaları sıkıştır")
+    parser.add_argument('--dup-hash', choices=sorted(HASH_ALGORITMALARI), default=KOPYA_HASH_ALGORITMASI,
+                        help="Kopya tespitinde tam hash algoritması (snapshot/denetim her zaman sha256)")
+    parser.add_argument('--dup-memory', type=float,
+                        help="Kopya tespiti bellek bütçesi (MB); aşılınca boyut/hash gruplaması diske taşınır")
+    parser.add_argument('--spill-dir', type=str, help="Disk taşması için geçici dizin (varsayılan: sistem geçici dizini)")
+    parser.add_argument('--verify-log', type=str, help="Denetim günlüğünün hash zincirini ve mührünü doğrula")
+    parser.add_argument('--stats', action='store_true', help="Çalışma sonunda faz süreleri ve sayaç özetini yazdır")
+    parser.add_argument('--stats-json', type=str, help="İstatistikleri JSON olarak bu dosyaya yaz")
+    parser.add_argument('--stats-prom', type=str, help="İstatistikleri Prometheus textfile (.prom) olarak bu dosyaya yaz")
+    parser.add_argument('--hash-cache-size', type=int, default=HASH_ONBELLEK_LIMITI, help="Önbellekte tutulacak en fazla hash sayısı")
     args = parser.parse_args()
+    if hasattr(sys.stdout, 'reconfigure'): sys.stdout.reconfigure(errors='backslashreplace')
+    OLCUMLER.etkin = bool(args.stats or args.stats_json or args.stats_prom)
+    KOPYA_HASH_ALGORITMASI = args.dup_hash
+    KOPYA_BELLEK_BUTCESI_MB = args.dup_memory
+    KOPYA_TASMA_DIZINI = args.spill_dir
+    if args.verify_log:
+        gunlugu_dogrula(args.verify_log)
+        return
 
     kok_dizin = None
 
-    if args.path:
-        kok_dizin = Path(args.path).resolve()
+    if args.path or args.roots_file:
+        kokler = kokleri_topla(args)
+        if kokler is None: return
+        if len(kokler) > 1:
+            risk_motoru = None
+            if args.rules:
+                try:
+                    risk_motoru = RiskMotoru.dosyadan_yukle(args.rules)
+                except (OSError, ValueError) as e:
+                    print(f"Hata: Kural dosyası yüklenemedi: {e}")
+                    return
+            oturum_id = yeni_oturum_id()
+            denetim = denetim_baslat(oturum_id)
+            try:
+                coklu_kok_calistir(args, kokler, risk_motoru, oturum_id)
+            finally:
+                denetim_durdur(denetim)
+                if OLCUMLER.etkin: istatistikleri_yaz(args, ",".join(map(str, kokler)), oturum=oturum_id)
+            return
+        kok_dizin = kokler[0] if kokler else None
     else:
         yol_str = guvenli_klasor_sec()
         if yol_str: kok_dizin = Path(yol_str).resolve()
@@ -517,20 +3180,82 @@ def main():
         print("\nUyarı: Klasör seçilmedi veya işlem iptal edildi.")
         return
 
-    uygun, sebep = guvenli_yol_mu(kok_dizin)
-    if not uygun:
-        print(f"\n🛑 GÜVENLİK ENGELİ: {sebep}")
+    risk_motoru = None
+    if args.rules:
+        try:
+            risk_motoru = RiskMotoru.dosyadan_yukle(args.rules)
+        except (OSError, ValueError) as e:
+            print(f"Hata: Kural dosyası yüklenemedi: {e}")
+            return
+    sinirlayici = None
+    if args.max_iops or args.max_bytes_per_sec:
+        sinirlayici = HizSinirlayici(args.max_iops, args.max_bytes_per_sec)
+    kasa_ayarlari = {'icerik_adresli': args.cas_vault or bool(args.vault_compress), 'sikistirma': args.vault_compress}
+
+    try:
+        oturum = KaleOturumu(kok_dizin, None, args.hash_cache != 'none' and (args.hash_cache or True),
+                             args.hash_cache_size, risk_motoru,
+                             sinirlayici, args.incremental or args.full_rescan, kasa_ayarlari,
+                             tarama_iscisi=args.scan_workers, tasima_iscisi=args.move_workers)
+    except PermissionError as e:
+        print(f"\n🛑 GÜVENLİK ENGELİ: {e}")
         print("Kurumsal güvenlik politikası gereği bu dizine işlem yapılamaz.")
         return
 
-    print(f"\n🔒 Hedef Kilitlendi: {kok_dizin}")
+    print(f"\n🔒 Hedef Kilitlendi: {oturum.kok}")
+    try:
+        oturumu_calistir(args, oturum)
+    finally:
+        if OLCUMLER.etkin: istatistikleri_yaz(args, oturum.kok, oturum.onbellek, oturum.id)
+        oturum.kapat()
 
+def istatistikleri_yaz(args, kok_dizin: Path, onbellek=None, oturum=None):
+    import json
+    ozet = OLCUMLER.ozet(onbellek, oturum)
+    if args.stats:
+        OLCUMLER.yazdir(ozet)
+    try:
+        if args.stats_json:
+            with open(args.stats_json, 'w', encoding='utf-8') as f:
+                json.dump(ozet, f, indent=2, ensure_ascii=False)
+        if args.stats_prom:
+            OLCUMLER.prometheus_yaz(ozet, args.stats_prom, str(kok_dizin))
+    except OSError as e:
+        print(f"Hata: İstatistik dosyası yazılamadı: {e}")
+
+def oturumu_calistir(args, oturum: KaleOturumu):
+    if args.verify_index:
+        print("Dizin indeksi doğrulanıyor...")
+        try:
+            sonuc = oturum.indeksi_dogrula(None if args.module in KASA_KOMUTLARI else args.module, args.arg)
+        except ValueError as e:
+            print(f"Hata: {e} (--module ile seçin)")
+            return
+        print(f"   Tutarlı: {sonuc['tutarli']} | Değişmiş: {sonuc['degismis']} | "
+              f"İndekste Eksik: {sonuc['eksik']} | İndekste Fazla: {sonuc['fazla']}")
+        if sonuc['degismis'] or sonuc['eksik'] or sonuc['fazla']:
+            print("   İndeks güncel değil; --full-rescan ile yenileyin.")
+        return
+    if args.watch:
+        if not args.module or args.module in KASA_KOMUTLARI:
+            print("Hata: İzleme modu için --module ile dosya bazlı modüller seçilmelidir.")
+            return
+        oturum.izle(args.module, args.arg, args.watch_interval, args.merge_report)
+        return
     if args.module:
         if args.module == 'restore':
-            kasa = KarantinaKasasi(kok_dizin)
-            kasa.dogrula_ve_geri_yukle()
+            oturum.geri_yukle(args.session, args.path_prefix, args.glob, args.reason)
+        elif args.module in ('list', 'search'):
+            if args.module == 'search' and not args.arg:
+                print("Hata: search için --arg ile aranacak metin verilmelidir.")
+                return
+            kasa_listele(oturum.kok, args.session, args.arg if args.module == 'search' else None,
+                         args.path_prefix, args.glob, args.reason)
+        elif args.module == 'purge':
+            kasa_imha(oturum.kok, args.older_than, args.yes, haric=oturum.id)
         else:
-            modulleri_calistir(kok_dizin, args.module, args.arg)
+            oturum.calistir(args.module, args.arg, args.merge_report, args.pipeline, args.full_rescan,
+                            args.snapshot_hash, args.yes)
     else:
         while True:
             ana_menu_goster()
@@ -540,17 +3265,25 @@ def main():
                 print("Çıkış yapılıyor...")
                 break
             
+            if secim == 'L':
+                kasa_listele(oturum.kok)
+                input("\nDevam etmek için Enter'a basın...")
+                continue
+
             if secim == 'R':
-                kasa = KarantinaKasasi(kok_dizin)
-                kasa.dogrula_ve_geri_yukle()
+                oturum.geri_yukle()
                 input("\nDevam etmek için Enter'a basın...")
                 continue
             
-            ekstra = None
-            if secim == '3': ekstra = input("Aranacak kelimeler (virgülle ayırın): ")
-            if secim == '16': ekstra = input("Hedef Klasör Boyutu (MB): ")
+            secimler = [s.strip() for s in secim.split(',') if s.strip()]
+            ekstra = {}
+            if '3' in secimler: ekstra['3'] = input("Aranacak kelimeler (virgülle ayırın): ")
+            if '16' in secimler: ekstra['16'] = input("Hedef Klasör Boyutu (MB): ")
+            birlesik = False
+            if len(secimler) > 1:
+                birlesik = input("Tek birleşik rapor üretilsin mi? (E/H): ").lower() == 'e'
             
-            modulleri_calistir(kok_dizin, secim, ekstra)
+            oturum.calistir(secim, ekstra, birlesik, tam_tarama=args.full_rescan, onayli=False)
             input("\nAna menüye dönmek için Enter'a basın...")
             ekran_temizle()
 